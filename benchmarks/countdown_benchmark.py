@@ -0,0 +1,84 @@
+"""
+Countdown formatting microbenchmark: per-item cost of turning due times into display rows.
+
+Measures, for --items synthetic deadlines (100k by default):
+    per_item_strftime_ns   the per-item path: year check, strftime and a countdown per row
+    per_item_batch_ns      CountdownFormatter.format_batch() (countdown texts only)
+    per_item_rows_ns       DeadlineEngine.rows() for all items (memoized due dates + batch countdowns)
+
+Each number is the median over --runs runs, divided by the number of items.
+
+Usage:
+    python benchmarks/countdown_benchmark.py [--items 100000] [--runs 5] [--locale zh]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from utils.countdown_format import CountdownFormatter, TEMPLATES
+from utils.deadline_engine import DeadlineEngine, DATE_FORMAT
+
+
+def synthetic_items(count, now, seed=42):
+    rng = random.Random(seed)
+    return [{'id': f'bench{i}', 'name': f'项目 {i}',
+             'date': (now + timedelta(minutes=rng.randint(-30 * 24 * 60, 365 * 24 * 60))).strftime(DATE_FORMAT)}
+            for i in range(count)]
+
+
+def median_ns_per_item(function, runs, count):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter_ns()
+        function()
+        timings.append(time.perf_counter_ns() - started)
+    return round(statistics.median(timings) / count, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--locale', default='zh', choices=sorted(TEMPLATES))
+    args = parser.parse_args()
+
+    now = datetime.now()
+    items = synthetic_items(args.items, now)
+    engine = DeadlineEngine(items, locale=args.locale)
+    due_times = [entry[0] for entry in engine._entries]
+    names = [entry[1] for entry in engine._entries]
+    formatter = CountdownFormatter(args.locale)
+
+    def strftime_per_item():
+        # What a tick costs without memoized dates and without the countdown cache
+        uncached = CountdownFormatter(args.locale)
+        row = uncached.template('row')
+        current_year = now.year
+        for due, name in zip(due_times, names):
+            date_str = due.strftime('%m-%d %H:%M' if due.year == current_year else DATE_FORMAT)
+            uncached._cache.clear()
+            row(name=name, date=date_str, countdown=uncached.format_delta(due - now))
+
+    results = {
+        'benchmark': 'countdown',
+        'items': args.items,
+        'locale': args.locale,
+        'per_item_strftime_ns': median_ns_per_item(strftime_per_item, args.runs, args.items),
+        'per_item_batch_ns': median_ns_per_item(lambda: formatter.format_batch(due_times, now), args.runs, args.items),
+        'per_item_rows_ns': median_ns_per_item(lambda: engine.rows(now), args.runs, args.items),
+        'distinct_countdowns': len(set(formatter.format_batch(due_times, now))),
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Benchmark suite: startup and event-loop latency of the overlay, plus DataManager I/O.
+
+For every synthetic deadline set (10, 1k, 10k, 100k items by default) it measures:
+    first_paint_ms        DisplayWindow construction until the first list refresh is drawn
+    tick_ms               one timer tick (update_display redraw), median over --ticks runs
+    settings_open_ms      SettingsWindow construction until drawn
+    treeview_reload_ms    full reload of the settings window's Treeview
+    load_ms / save_ms     DataManager.load_ddl_items() / full save, per storage backend
+
+Results are written as JSON (one file per run, named after the git commit) so
+that runs of different commits can be compared with compare_results().
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 10,1000,10000,100000] [--output results.json]
+
+Without a display on Linux, the suite starts itself under Xvfb (xvfb-run or Xvfb must be installed).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', 'results')
+DEFAULT_SIZES = (10, 1000, 10000, 100000)
+DEFAULT_TICKS = 20
+XVFB_DISPLAY = ':99'
+
+
+def ensure_display():
+    """Re-runs this script under a virtual X server if there is no display (Linux only)."""
+    if sys.platform in ('win32', 'darwin') or os.environ.get('DISPLAY'):
+        return None
+    if shutil.which('xvfb-run'):
+        os.execvp('xvfb-run', ['xvfb-run', '-a', sys.executable] + sys.argv)
+    if shutil.which('Xvfb'):
+        xvfb = subprocess.Popen(['Xvfb', XVFB_DISPLAY, '-screen', '0', '1280x1024x24'],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        os.environ['DISPLAY'] = XVFB_DISPLAY
+        time.sleep(0.5) # Give the server time to accept connections
+        return xvfb
+    sys.exit("No display and no Xvfb found: install xvfb (e.g. apt install xvfb) or set DISPLAY.")
+
+
+def synthetic_items(count, seed=42):
+    """Deadlines spread over the past month and the next year, with a few invalid dates."""
+    rng = random.Random(seed)
+    now = datetime.now()
+    items = []
+    for i in range(count):
+        if i % 500 == 499:
+            date_str = '日期无效'
+        else:
+            due = now + timedelta(minutes=rng.randint(-30 * 24 * 60, 365 * 24 * 60))
+            date_str = due.strftime('%Y-%m-%d %H:%M')
+        items.append({'id': f'bench{i}', 'name': f'项目 {i}', 'date': date_str})
+    return items
+
+
+def timed_ms(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def median_ms(function, runs):
+    return round(statistics.median(timed_ms(function)[0] for _ in range(runs)), 3)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def bench_storage(data_dir, items):
+    from utils.data_manager import DataManager
+
+    results = {}
+    for backend in ('json', 'journal', 'sqlite'):
+        backend_dir = os.path.join(data_dir, backend)
+        os.makedirs(backend_dir)
+        with open(os.path.join(backend_dir, 'ddl_items.json'), 'w', encoding='utf-8') as f:
+            json.dump(items, f, ensure_ascii=False)
+
+        os.environ['DDLTOOL_DATA_DIR'] = backend_dir
+        data_manager = DataManager()
+        data_manager.set_storage_backend(backend)
+        data_manager.load_ddl_items() # sqlite: one-time migration from the JSON file
+        load_ms, _ = timed_ms(data_manager.load_ddl_items)
+        save_ms, _ = timed_ms(data_manager.save_ddl_items, data_manager.get_ddl_items())
+        # A single edit, the common case in the settings window
+        data_manager.update_ddl_item(items[0]['id'], {'name': '已修改'})
+        save_one_ms, _ = timed_ms(data_manager.save_ddl_items)
+        data_manager.close()
+        results[backend] = {'load_ms': round(load_ms, 3), 'save_ms': round(save_ms, 3),
+                            'save_one_change_ms': round(save_one_ms, 3)}
+    return results
+
+
+def bench_gui(data_dir, items, ticks):
+    from gui.display_window import DisplayWindow
+    from gui.settings_window import SettingsWindow
+    from utils.data_manager import DataManager
+
+    with open(os.path.join(data_dir, 'ddl_items.json'), 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False)
+    os.environ['DDLTOOL_DATA_DIR'] = data_dir
+    data_manager = DataManager()
+    settings = data_manager.load_settings()
+    ddl_items = data_manager.load_ddl_items()
+
+    results = {}
+    started = time.perf_counter()
+    display_window = DisplayWindow(ddl_items, settings, data_manager)
+    display_window.update() # Runs the idle callbacks: the first list refresh and the drawing
+    results['first_paint_ms'] = round((time.perf_counter() - started) * 1000, 3)
+
+    def tick():
+        display_window.update_display()
+        display_window.update_idletasks()
+    results['tick_ms'] = median_ms(tick, ticks)
+
+    try:
+        started = time.perf_counter()
+        settings_window = SettingsWindow(display_window, settings, data_manager)
+        settings_window.update_idletasks()
+        results['settings_open_ms'] = round((time.perf_counter() - started) * 1000, 3)
+
+        def reload_treeview():
+            settings_window._load_ddls_to_treeview()
+            settings_window.update_idletasks()
+        results['treeview_reload_ms'] = median_ms(reload_treeview, 3)
+        settings_window.destroy()
+    except Exception as e: # e.g. a missing optional theme; keep the other numbers
+        results['settings_error'] = repr(e)
+
+    display_window.destroy()
+    data_manager.close()
+    return results
+
+
+def compare_results(old_path, new_path, threshold=1.2):
+    """Prints the metrics that got slower by more than 'threshold' between two result files."""
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+
+    def metrics(result, prefix=''):
+        for key, value in result.items():
+            if isinstance(value, dict):
+                yield from metrics(value, f"{prefix}{key}.")
+            elif key.endswith('_ms'):
+                yield f"{prefix}{key}", value
+
+    old_metrics = dict(metrics(old['results']))
+    regressions = 0
+    for name, value in metrics(new['results']):
+        before = old_metrics.get(name)
+        if before and value > before * threshold:
+            print(f"{name}: {before} ms -> {value} ms ({value / before:.2f}x)")
+            regressions += 1
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma separated numbers of deadlines")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS)
+    parser.add_argument('--no-gui', action='store_true', help="only the DataManager benchmarks")
+    parser.add_argument('--output', help=f"result file (default: {RESULTS_DIR}/<commit>.json)")
+    parser.add_argument('--compare', metavar='OLD_JSON', help="report regressions against an earlier result file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, PROJECT_ROOT)
+    xvfb = None if args.no_gui else ensure_display()
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {},
+    }
+    try:
+        for size in (int(size) for size in args.sizes.split(',')):
+            items = synthetic_items(size)
+            data_dir = tempfile.mkdtemp(prefix='ddltool-bench-')
+            try:
+                result = {'storage': bench_storage(data_dir, items)}
+                if not args.no_gui:
+                    gc.collect()
+                    result.update(bench_gui(data_dir, items, args.ticks))
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+            report['results'][str(size)] = result
+            print(f"{size} items: {json.dumps(result, ensure_ascii=False)}", flush=True)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    output_path = args.output or os.path.join(RESULTS_DIR, f'{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {output_path}")
+
+    if args.compare:
+        return 1 if compare_results(args.compare, output_path) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Startup benchmark: time from launching ddltool.py to the first painted overlay.
+
+Starts the real application several times against a temporary data folder
+(DDLTOOL_DATA_DIR) filled with sample deadlines. With DDLTOOL_STARTUP_BENCHMARK
+set, ddltool.py paints its first frame, prints the elapsed time plus the lazily
+loaded modules that were imported anyway, and quits.
+
+Usage (needs a display, e.g. under Xvfb on Linux):
+    python benchmarks/startup_benchmark.py [--runs 10] [--items 200] [--target-ms 400]
+
+Exits with 1 if the median time-to-first-paint misses the target or if any
+module that should load on first use was imported during startup.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Median time-to-first-paint (measured inside ddltool.py, interpreter start-up excluded)
+TARGET_FIRST_PAINT_MS = 400
+
+
+def write_sample_data(data_dir, item_count):
+    now = datetime.now()
+    random.seed(42)
+    items = [{'id': f'bench{i}', 'name': f'项目 {i}',
+              'date': (now + timedelta(minutes=random.randint(-30 * 24 * 60, 365 * 24 * 60))).strftime('%Y-%m-%d %H:%M')}
+             for i in range(item_count)]
+    with open(os.path.join(data_dir, 'ddl_items.json'), 'w', encoding='utf-8') as f:
+        json.dump(items, f, ensure_ascii=False)
+
+
+def run_once(data_dir):
+    env = dict(os.environ, DDLTOOL_DATA_DIR=data_dir, DDLTOOL_STARTUP_BENCHMARK='1')
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, os.path.join(PROJECT_ROOT, 'ddltool.py')], env=env,
+                               cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60)
+    wall_ms = (time.perf_counter() - started) * 1000
+    for line in completed.stdout.splitlines():
+        if line.startswith('{'):
+            result = json.loads(line)
+            result['process_wall_ms'] = round(wall_ms, 1)
+            return result
+    raise RuntimeError(f"ddltool.py didn't report a first paint (exit code {completed.returncode}):\n{completed.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--items', type=int, default=200, help="sample deadlines in ddl_items.json")
+    parser.add_argument('--target-ms', type=float, default=TARGET_FIRST_PAINT_MS)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='ddltool-startup-')
+    try:
+        write_sample_data(data_dir, args.items)
+        run_once(data_dir) # Warm-up: fills the OS file cache and __pycache__
+        runs = [run_once(data_dir) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    first_paint = [run['first_paint_ms'] for run in runs]
+    lazy_loaded = sorted({name for run in runs for name in run['lazy_modules_loaded']})
+    summary = {
+        'benchmark': 'startup',
+        'items': args.items,
+        'runs': args.runs,
+        'first_paint_ms_median': round(statistics.median(first_paint), 1),
+        'first_paint_ms_min': min(first_paint),
+        'first_paint_ms_max': max(first_paint),
+        'process_wall_ms_median': round(statistics.median(run['process_wall_ms'] for run in runs), 1),
+        'target_ms': args.target_ms,
+        'lazy_modules_loaded': lazy_loaded,
+    }
+    summary['passed'] = summary['first_paint_ms_median'] <= args.target_ms and not lazy_loaded
+
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    return 0 if summary['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,24 +1,91 @@
-import tkinter as tk
+import time
+_STARTED = time.perf_counter() # Start of the startup benchmark's time-to-first-paint
+
+import argparse
 import os
 import sys
 import json # 导入json
 
-# 从我们自己写的模块导入
-from gui.display_window import DisplayWindow # DisplayWindow 现在继承自 ThemedTk
-from gui.settings_window import SettingsWindow
-from utils.data_manager import DataManager
-# system_helper 不在这里直接使用，由 settings_window 使用
+# 单实例检查必须在导入 tkinter / ttkthemes 之前完成，第二次启动时只转发命令然后立即退出
+# (utils.single_instance 在 main() 中导入：命令行子命令不需要它的 socket)
+from utils.data_manager import get_data_dir
+
+# Headless subcommands, handled by utils/cli.py (kept in sync with utils.cli.COMMANDS)
+CLI_COMMANDS = ('list', 'add', 'rm', 'next', 'import', 'export')
+# How often the Tk loop checks for commands forwarded by later launches
+COMMAND_POLL_MS = 250
+# Set by benchmarks/startup_benchmark.py: report the time to the first painted frame and quit
+STARTUP_BENCHMARK_ENV = 'DDLTOOL_STARTUP_BENCHMARK'
+# Modules that must not be needed to paint the overlay (loaded on first use)
+LAZY_MODULES = ('gui.settings_window', 'tkcalendar', 'utils.system_helper', 'winreg',
+                'utils.feed_server', 'utils.importer', 'sqlite3')
+
+
+def report_first_paint(display_window):
+    # Prints the startup benchmark result as JSON, then closes without saving anything
+    display_window.update_idletasks()
+    print(json.dumps({
+        'first_paint_ms': round((time.perf_counter() - _STARTED) * 1000, 1),
+        'lazy_modules_loaded': [name for name in LAZY_MODULES if name in sys.modules],
+    }), flush=True)
+    display_window.destroy()
+
+
+def parse_args(argv=None):
+    from utils.single_instance import COMMAND_SHOW, COMMAND_RELOAD, COMMAND_SETTINGS
+
+    parser = argparse.ArgumentParser(description="DDL 工具")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--reload', dest='command', action='store_const', const=COMMAND_RELOAD,
+                       help="让正在运行的实例重新载入 DDL 项目")
+    group.add_argument('--settings', dest='command', action='store_const', const=COMMAND_SETTINGS,
+                       help="打开设置窗口")
+    parser.set_defaults(command=COMMAND_SHOW)
+    return parser.parse_args(argv)
+
 
 def main():
+    # 命令行子命令 (list/add/rm/next/import/export) 不需要界面，也不占用单实例锁
+    # (界面只有 --reload / --settings 选项，第一个非选项参数就是子命令)
+    if next((arg for arg in sys.argv[1:] if not arg.startswith('-')), None) in CLI_COMMANDS:
+        from utils.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    from utils.single_instance import (SingleInstance, send_command,
+                                       COMMAND_SHOW, COMMAND_RELOAD, COMMAND_SETTINGS)
+    args = parse_args()
+    data_dir = get_data_dir()
+    instance = SingleInstance(data_dir)
+    if not instance.acquire():
+        # 已有实例在运行 (例如开机自启后又手动启动)：把命令交给它，不再创建第二个窗口
+        if not send_command(data_dir, args.command):
+            print("DDL 工具已在运行，但无法与其通信。")
+            sys.exit(1)
+        return
+    instance.start_server()
+
+    # 只有第一个实例才需要界面
+    import tkinter as tk
+    # 从我们自己写的模块导入
+    # 只导入绘制悬浮窗所需的模块；设置窗口 (tkcalendar、system_helper) 在第一次打开时才导入
+    from gui.display_window import DisplayWindow # DisplayWindow 现在继承自 ThemedTk
+    from utils.data_manager import DataManager
+
     # 确定数据文件路径 - DataManager 会处理 PyInstaller 打包的情况
     data_manager = DataManager()
 
-    # 加载初始数据和设置
-    ddl_items = data_manager.load_ddl_items()
+    # 加载初始数据和设置 (先加载设置，其中的 storage_backend 决定项目的存储方式)
     settings = data_manager.load_settings()
+    data_manager.set_storage_backend(settings.get('storage_backend', 'json'))
+    ddl_items = data_manager.load_ddl_items()
+    # 可选：在本机端口上提供 ICS/JSON 订阅源 (settings 中的 feed_port，0 表示关闭)
+    feed_server = None
+    if settings.get('feed_port', 0):
+        from utils.feed_server import start_feed_server # http.server is only needed if the feed is on
+        feed_server = start_feed_server(data_manager, settings['feed_port'])
 
     # 创建主应用窗口 (DisplayWindow 现在继承自 ThemedTk)
-    # ddl_items 和 settings 作为引用传递，settings_window 将直接修改它们
+    # settings 作为引用传递，settings_window 将直接修改它；项目的修改通过 data_manager 进行
     # DisplayWindow 会在初始化时读取 settings 中的主题并应用
     display_window = DisplayWindow(ddl_items, settings, data_manager)
 
@@ -26,12 +93,12 @@ def main():
     # 集中绑定到 main_frame，因为它覆盖了整个可点击区域
     if display_window.main_frame: # Ensure frame is created
         # Left double click to open settings
-        display_window.main_frame.bind("<Double-1>", lambda event: open_settings_window(display_window, ddl_items, settings, data_manager))
+        display_window.main_frame.bind("<Double-1>", lambda event: open_settings_window(display_window, settings, data_manager))
         # Right click to show menu (handled inside DisplayWindow)
         # display_window.main_frame.bind("<Button-3>", lambda event: display_window.show_context_menu(event)) # Binding handled inside DisplayWindow
 
     else: # Fallback binding if main_frame creation failed or structure changed
-        display_window.bind("<Double-1>", lambda event: open_settings_window(display_window, ddl_items, settings, data_manager))
+        display_window.bind("<Double-1>", lambda event: open_settings_window(display_window, settings, data_manager))
         # Fallback for right click if main_frame is not available
         # display_window.bind("<Button-3>", lambda event: display_window.show_context_menu(event)) # Binding handled inside DisplayWindow
 
@@ -41,17 +108,21 @@ def main():
         # 在关闭前保存数据和设置
         # 从 display_window 获取当前的 settings (可能用户拖动改变了位置，应用了临时设置)
         current_settings = display_window.get_current_settings() # DisplayWindow 中添加此方法
-        data_manager.save_settings(current_settings)
+        data_manager.request_save_settings(current_settings)
+        if feed_server is not None:
+            feed_server.stop()
+        instance.close()
+        data_manager.close() # Writes the pending background saves, lets a running journal compaction finish
         # DDL items 在 settings_window 保存修改后就已经更新并保存了，这里可以再保存一次以防万一，
         # 或者依赖 settings_window 的保存。我们依赖 settings_window 的保存。
-        # data_manager.save_ddl_items(ddl_items)
+        # data_manager.save_ddl_items()
 
         display_window.destroy()
 
     display_window.protocol("WM_DELETE_WINDOW", on_closing)
 
     # 这是一个简单的打开设置窗口函数
-    def open_settings_window(parent_window, ddl_items, settings, data_manager):
+    def open_settings_window(parent_window, settings, data_manager):
          # 确保同时只有一个设置窗口
          if not hasattr(open_settings_window, 'settings_win') or not tk.Toplevel.winfo_exists(open_settings_window.settings_win):
             # 在打开设置窗口前，从主窗口获取当前设置（特别是位置/大小）
@@ -61,7 +132,8 @@ def main():
             settings.update(current_display_settings) # 更新传递的 settings 字典
 
             # Create and show settings window
-            open_settings_window.settings_win = SettingsWindow(parent_window, ddl_items, settings, data_manager)
+            from gui.settings_window import SettingsWindow
+            open_settings_window.settings_win = SettingsWindow(parent_window, settings, data_manager)
             # Let parent window wait for settings window to close. This makes the settings window modal.
             # wait_window handles grab_set/grab_release automatically.
             parent_window.wait_window(open_settings_window.settings_win)
@@ -79,8 +151,36 @@ def main():
              open_settings_window.settings_win.focus_force()
 
 
+    # 处理后续启动转发过来的命令
+    def handle_command(command):
+        if command == COMMAND_SHOW:
+            display_window.deiconify()
+            display_window.lift()
+            display_window.attributes('-topmost', True)
+        elif command == COMMAND_RELOAD:
+            if data_manager.reload_ddl_items_if_changed(force=True):
+                display_window.update_display()
+        elif command == COMMAND_SETTINGS:
+            open_settings_window(display_window, settings, data_manager)
+
+    def poll_commands():
+        # Re-arm first: opening the settings window waits until it is closed
+        display_window.after(COMMAND_POLL_MS, poll_commands)
+        while not instance.commands.empty():
+            handle_command(instance.commands.get_nowait())
+
+    # 第一次启动本身也可以带 --settings
+    if args.command != COMMAND_SHOW:
+        instance.commands.put(args.command)
+    display_window.after(COMMAND_POLL_MS, poll_commands)
+
+    if os.environ.get(STARTUP_BENCHMARK_ENV):
+        # Runs after the first refresh of the list, which is also queued as an idle callback
+        display_window.after_idle(report_first_paint, display_window)
+
     # 运行主循环
     display_window.mainloop()
+    instance.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,138 @@
+import tkinter as tk
+from datetime import datetime
+
+# Rows scrolled per mouse wheel notch
+SCROLL_ROWS = 3
+# Inner padding of the text, similar to the padding of the tk.Label it replaces
+TEXT_PAD_X = 2
+TEXT_PAD_Y = 1
+
+
+class DeadlineListView(tk.Canvas):
+    """
+    Virtualized list of deadline rows drawn on a Canvas.
+
+    Only as many canvas text items as fit into the visible height are created,
+    and only the rows whose text changed are reconfigured on a refresh. The
+    rows themselves come from a DeadlineEngine, which formats just the
+    visible slice of the list.
+    """
+
+    def __init__(self, parent, engine, placeholder="正在载入...", **kwargs):
+        kwargs.setdefault('highlightthickness', 0)
+        kwargs.setdefault('borderwidth', 0)
+        tk.Canvas.__init__(self, parent, **kwargs)
+        self.engine = engine
+        self.placeholder = placeholder # Shown until the first refresh()
+
+        self._font = None
+        self._fg_color = 'white'
+        self._line_height = 16 # Updated from the font metrics in set_font()
+        self._top = 0 # Index of the first visible row
+        self._now = None # Reference time of the last refresh, None before the first one
+
+        self._text_items = [] # Pool of canvas text item ids, one per visible line
+        self._shown_texts = [] # Text currently shown by each pooled item
+
+        self.bind('<Configure>', self._on_configure)
+        # Windows / macOS
+        self.bind('<MouseWheel>', self.on_mouse_wheel)
+        # X11
+        self.bind('<Button-4>', self.on_scroll_up)
+        self.bind('<Button-5>', self.on_scroll_down)
+
+    def set_font(self, font, line_height=None):
+        """
+        Sets the font of the rows (a tkFont.Font). The line height is taken
+        from the font metrics unless given (e.g. from a FontCache).
+        """
+        self._font = font
+        try:
+            if line_height is None:
+                line_height = font.metrics('linespace')
+            self._line_height = max(int(line_height), 1)
+        except Exception as e:
+            print(f"获取字体行高失败: {e}")
+        for index, text_item in enumerate(self._text_items):
+            self.coords(text_item, TEXT_PAD_X, TEXT_PAD_Y + index * self._line_height)
+            self.itemconfigure(text_item, font=font)
+        self._redraw()
+
+    def set_colors(self, bg_color, fg_color):
+        self.config(bg=bg_color)
+        if fg_color != self._fg_color:
+            self._fg_color = fg_color
+            for text_item in self._text_items:
+                self.itemconfigure(text_item, fill=fg_color)
+
+    def refresh(self, now=None):
+        """Re-renders the visible rows for the given time (default: now)."""
+        self._now = now if now is not None else datetime.now()
+        self._redraw()
+
+    def scroll(self, rows):
+        """Scrolls the list by the given number of rows (negative scrolls up)."""
+        new_top = self._clamp_top(self._top + rows)
+        if new_top != self._top:
+            self._top = new_top
+            self._redraw()
+
+    def on_mouse_wheel(self, event):
+        # event.delta is a multiple of 120 on Windows, small values on macOS
+        if event.delta:
+            notches = max(abs(event.delta) // 120, 1)
+            self.scroll((-SCROLL_ROWS if event.delta > 0 else SCROLL_ROWS) * notches)
+        return "break"
+
+    def on_scroll_up(self, event):
+        self.scroll(-SCROLL_ROWS)
+        return "break"
+
+    def on_scroll_down(self, event):
+        self.scroll(SCROLL_ROWS)
+        return "break"
+
+    def _visible_row_count(self):
+        return max(-(-(self.winfo_height() - TEXT_PAD_Y) // self._line_height), 1) # Round up, partial last line
+
+    def _total_row_count(self):
+        if self._now is None:
+            return 1
+        return self.engine.row_count()
+
+    def _clamp_top(self, top):
+        # Don't scroll past the point where the last row becomes fully visible
+        fully_visible = max((self.winfo_height() - TEXT_PAD_Y) // self._line_height, 1)
+        return max(0, min(top, self._total_row_count() - fully_visible))
+
+    def _ensure_pool_size(self, size):
+        # Create / delete canvas text items so that there is exactly one per visible line
+        while len(self._text_items) < size:
+            index = len(self._text_items)
+            text_item = self.create_text(TEXT_PAD_X, TEXT_PAD_Y + index * self._line_height,
+                                         anchor='nw', text='', fill=self._fg_color, font=self._font)
+            self._text_items.append(text_item)
+            self._shown_texts.append('')
+        while len(self._text_items) > size:
+            self.delete(self._text_items.pop())
+            self._shown_texts.pop()
+
+    def _redraw(self):
+        visible_count = self._visible_row_count()
+        self._ensure_pool_size(visible_count)
+        self._top = self._clamp_top(self._top)
+
+        if self._now is None:
+            rows = [self.placeholder]
+        else:
+            rows = self.engine.rows(self._now, self._top, self._top + visible_count)
+
+        # Only touch the canvas items whose text actually changed
+        for index, text_item in enumerate(self._text_items):
+            text = rows[index] if index < len(rows) else ''
+            if text != self._shown_texts[index]:
+                self.itemconfigure(text_item, text=text)
+                self._shown_texts[index] = text
+
+    def _on_configure(self, event):
+        self._redraw()
@@ -1,12 +1,32 @@
 import tkinter as tk
 from tkinter import font as tkFont # 引入字体模块
-from datetime import datetime, timedelta
+from datetime import datetime
 import sys
 import os
 # 需要安装 ttkthemes: pip install ttkthemes
 from ttkthemes import ThemedTk
 # 引入 Tkinter Menu
 from tkinter import Menu
+from tkinter import messagebox
+
+from utils.deadline_engine import DeadlineEngine
+from utils.countdown_format import DEFAULT_LOCALE
+from utils.refresh_scheduler import RefreshScheduler
+from utils.reminder_scheduler import ReminderScheduler, DEFAULT_REMINDER_MINUTES, describe_minutes
+from gui.deadline_list_view import DeadlineListView
+from gui.font_cache import FontCache
+
+# How often the results of background saves are checked while saves are outstanding
+SAVE_POLL_MS = 100
+# Dragging moves the window at most once per frame (~60 Hz), whatever the mouse polling rate
+DRAG_FRAME_MS = 16
+# How often ddl_items.json is checked for changes made by other programs (only a stat() call)
+FILE_POLL_MS = 2000
+# A reminder flashes the overlay (swapped colors) this many times, FLASH_MS per half period
+FLASH_COUNT = 6
+FLASH_MS = 250
+# How long a reminder toast stays open (a click closes it earlier)
+TOAST_MS = 8000
 
 
 class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
@@ -20,11 +40,20 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
             ThemedTk.__init__(self, theme='clam') # 如果指定主题加载失败，回退到 'clam'
             settings['theme'] = 'clam' # Update settings, will be saved later
 
+        # Values of the last apply_settings(), so only changed properties cause Tk calls
+        self._applied = {}
+
         self.ddl_items = ddl_items
         self.settings = settings
         self.data_manager = data_manager
+        # 解析并排序后的截止日期集合，跟随 data_manager 中项目的新增/编辑/删除
+        self.engine = DeadlineEngine(self.ddl_items, settings.get('countdown_locale', DEFAULT_LOCALE))
+        self.data_manager.add_listener(self.engine.on_data_change)
 
         self.title("DDL 工具")
+        # Fonts are reused across apply_settings() calls (the settings preview applies them often)
+        self.font_cache = FontCache(self)
+        self._font_key = None # (family, size, weight) currently applied
 
         # 设置窗口属性：无边框，置顶
         self.overrideredirect(True)
@@ -40,11 +69,11 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
         self.title_label = tk.Label(self.main_frame, text="项目截止日期") # Color, font set in apply_settings
         self.title_label.place(relx=0.5, rely=0, anchor='n') # Place at top center
 
-        # 显示 DDL 列表的 Label
-        self.ddl_list_label = tk.Label(self.main_frame, text="正在载入...", justify="left", anchor="nw") # Color, font set in apply_settings
-        # Place below title, fill remaining space, leaving some padding
-        # padx/pady added to place call for inner padding
-        self.ddl_list_label.place(relx=0, rely=0, relwidth=1, relheight=1, y=25, bordermode='inside') # y=25 pushes it down
+        # 显示 DDL 列表的虚拟化列表 (只为可见的行创建 Canvas 文本项)
+        self.ddl_list_view = DeadlineListView(self.main_frame, self.engine, placeholder="正在载入...") # Color, font set in apply_settings
+        # Place below title, fill remaining space
+        # height=-25 keeps the bottom edge inside the window, so only really visible rows are drawn
+        self.ddl_list_view.place(relx=0, rely=0, relwidth=1, relheight=1, y=25, height=-25, bordermode='inside') # y=25 pushes it down
 
         # Apply initial settings (position, size, colors, font, alpha etc.)
         self.apply_settings(self.settings) # Frame and Labels are created now, safe to call
@@ -52,14 +81,26 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
         # --- 窗口拖动功能 ---
         self._drag_x = 0
         self._drag_y = 0
+        self._drag_target = None # Latest (x, y) from the mouse, not applied yet
+        self._drag_after_id = None # The single pending frame callback of a drag
+        self._dragging = False # True once the mouse moved with the button held
         # Bind drag events to the main frame
         self.main_frame.bind("<ButtonPress-1>", self.start_drag)
         self.main_frame.bind("<B1-Motion>", self.do_drag)
+        self.main_frame.bind("<ButtonRelease-1>", self.end_drag)
         # Also bind to labels to make whole area draggable
         self.title_label.bind("<ButtonPress-1>", self.start_drag)
         self.title_label.bind("<B1-Motion>", self.do_drag)
-        self.ddl_list_label.bind("<ButtonPress-1>", self.start_drag)
-        self.ddl_list_label.bind("<B1-Motion>", self.do_drag)
+        self.title_label.bind("<ButtonRelease-1>", self.end_drag)
+        self.ddl_list_view.bind("<ButtonPress-1>", self.start_drag)
+        self.ddl_list_view.bind("<B1-Motion>", self.do_drag)
+        self.ddl_list_view.bind("<ButtonRelease-1>", self.end_drag)
+
+        # Mouse wheel scrolls the DDL list from anywhere in the window
+        # (the list view handles its own wheel events and stops them there)
+        self.bind("<MouseWheel>", self.ddl_list_view.on_mouse_wheel)
+        self.bind("<Button-4>", self.ddl_list_view.on_scroll_up)
+        self.bind("<Button-5>", self.ddl_list_view.on_scroll_down)
 
         # --- 右键菜单 ---
         self.context_menu = Menu(self, tearoff=0)
@@ -71,7 +112,7 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
         self.bind("<Button-3>", self.show_context_menu)
         self.main_frame.bind("<Button-3>", self.show_context_menu)
         self.title_label.bind("<Button-3>", self.show_context_menu)
-        self.ddl_list_label.bind("<Button-3>", self.show_context_menu)
+        self.ddl_list_view.bind("<Button-3>", self.show_context_menu)
 
 
         # Double-click event binding is handled in ddltool.py (bound to main_frame)
@@ -79,11 +120,15 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
         self.bind("<Button-1>", lambda event: None)
         self.main_frame.bind("<Button-1>", lambda event: None)
         self.title_label.bind("<Button-1>", lambda event: None)
-        self.ddl_list_label.bind("<Button-1>", lambda event: None)
+        self.ddl_list_view.bind("<Button-1>", lambda event: None)
 
 
         # 定时更新显示
         self.schedule_update()
+        # 截止前提醒 (闪烁 / 弹出提示)
+        self.schedule_reminders()
+        # 外部程序修改 ddl_items.json 后自动重新载入
+        self.after(FILE_POLL_MS, self._check_data_file)
 
 
     def open_settings(self):
@@ -132,11 +177,13 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
         # Let's create the SettingsWindow directly here.
         # Ensure only one settings window is open.
         if not hasattr(self, '_settings_win') or not tk.Toplevel.winfo_exists(self._settings_win):
+             # Imported on first use: the settings window (tkcalendar, system_helper) isn't needed to paint the overlay
+             from gui.settings_window import SettingsWindow
              # Get current settings (especially geo) to pass to the settings window
              current_display_settings = self.get_current_settings()
              self.settings.update(current_display_settings) # Update the settings dict reference
 
-             self._settings_win = SettingsWindow(self, self.ddl_items, self.settings, self.data_manager)
+             self._settings_win = SettingsWindow(self, self.settings, self.data_manager)
              # Make settings window modal relative to display window
              self._settings_win.transient(self)
              self._settings_win.grab_set()
@@ -158,9 +205,13 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
 
     def close_application(self):
         # This method is called by the context menu's "关闭" command
-        # Trigger the window closing protocol to ensure data is saved
-        self.protocol("WM_DELETE_WINDOW", self.close_application) # Re-bind to itself if needed, though WM_DELETE_WINDOW is usually sufficient
-        self.destroy() # This will trigger the WM_DELETE_WINDOW protocol handler (on_closing in ddltool.py)
+        # destroy() doesn't run the WM_DELETE_WINDOW handler (on_closing in ddltool.py),
+        # call it directly so settings are saved and the background writer is flushed
+        handler = self.protocol("WM_DELETE_WINDOW")
+        if handler:
+            self.tk.call(handler)
+        else:
+            self.destroy()
 
 
     def show_context_menu(self, event):
@@ -172,24 +223,29 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
             self.context_menu.grab_release()
 
 
-    def _update_label_font(self):
+    def _update_label_font(self, settings=None):
         # 根据设置创建并应用字体
-        font_family = self.settings.get('font_family', 'Arial') # 默认字体
-        font_size = self.settings.get('font_size', 10) # 默认大小
-        font_weight = self.settings.get('font_weight', 'normal') # 默认粗细
+        if settings is None:
+            settings = self.settings
+        font_family = settings.get('font_family', 'Arial') # 默认字体
+        font_size = settings.get('font_size', 10) # 默认大小
+        font_weight = settings.get('font_weight', 'normal') # 默认粗细
+
+        font_key = (font_family, font_size, font_weight)
+        if font_key == self._font_key:
+             return # Unchanged, keep the widgets as they are
 
         try:
              # Check if font exists or is available
-             app_font = tkFont.Font(family=font_family, size=font_size, weight=font_weight)
-             self.title_label.config(font=app_font)
-             self.ddl_list_label.config(font=app_font)
-        except tkFont.TclError as e:
+             app_font = self.font_cache.get(font_family, font_size, font_weight)
+        except (tkFont.TclError, ValueError, TypeError) as e:
              print(f"警告: 应用字体 '{font_family}' 大小 {font_size} 粗细 {font_weight} 失败. 错误: {e}. 使用默认字体.")
              # Apply default font
-             default_font = tkFont.Font(family='Arial', size=10, weight='normal')
-             self.title_label.config(font=default_font)
-             self.ddl_list_label.config(font=default_font)
+             app_font = self.font_cache.get('Arial', 10, 'normal')
              # Optionally update settings with defaults or notify user
+        self.title_label.config(font=app_font)
+        self.ddl_list_view.set_font(app_font, self.font_cache.metrics(app_font)['linespace'])
+        self._font_key = font_key
 
 
     def start_drag(self, event):
@@ -200,22 +256,74 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
 
 
     def do_drag(self, event):
-        # Calculate new window position
+        # Calculate new window position. Only the latest one is kept, it is
+        # applied by the next frame callback (one geometry call per frame).
+        self._drag_target = (event.x_root - self._drag_x, event.y_root - self._drag_y)
+        self._dragging = True
+        if self._drag_after_id is None:
+            self._drag_after_id = self.after(DRAG_FRAME_MS, self._apply_drag)
+
+    def _apply_drag(self):
+        self._drag_after_id = None
+        if self._drag_target is not None:
+            new_x, new_y = self._drag_target
+            self._drag_target = None
+            self.geometry(f"+{new_x}+{new_y}") # Change position only
+
+    def end_drag(self, event):
+        if not self._dragging:
+            return # Just a click
+        self._dragging = False
+        # Apply the final position right away instead of waiting for the frame callback
+        if self._drag_after_id is not None:
+            self.after_cancel(self._drag_after_id)
+            self._drag_after_id = None
+        self._drag_target = None
         new_x = event.x_root - self._drag_x
         new_y = event.y_root - self._drag_y
-
-        self.geometry(f"+{new_x}+{new_y}") # Change position only
-
+        self.geometry(f"+{new_x}+{new_y}")
+
+        # Remember the new position (saved on the background writer thread)
+        self.settings['window_x'] = new_x
+        self.settings['window_y'] = new_y
+        self._applied.pop('geometry', None) # Moved by hand: the next apply_settings() sets it again
+        self.data_manager.request_save_settings(self.settings)
+        self.watch_background_saves()
+
+
+    def set_theme(self, theme_name, *args, **kwargs):
+         # Switching the theme restyles every ttk widget, skip it if the theme is already active
+         if theme_name == getattr(self, '_applied_theme', None):
+             return
+         ThemedTk.set_theme(self, theme_name, *args, **kwargs)
+         self._applied_theme = theme_name
+
+    def _settings_changed(self, name, value):
+         # True (and remembers the value) if 'value' differs from what was applied last time
+         if name in self._applied and self._applied[name] == value:
+             return False
+         self._applied[name] = value
+         return True
 
     def apply_settings(self, settings):
-         # Apply settings received from settings window or loaded from file
+         # Apply settings received from settings window or loaded from file.
+         # Only the properties whose values changed since the last call are passed to Tk.
          self.settings = settings # Update internal settings reference
+         self.preview_settings(settings)
+         if hasattr(self, 'reminder_scheduler'):
+             self.reminder_scheduler.set_reminder_minutes(settings.get('reminder_minutes', DEFAULT_REMINDER_MINUTES))
+         if self.engine.set_locale(settings.get('countdown_locale', DEFAULT_LOCALE)) and hasattr(self, 'refresh_scheduler'):
+             self.update_display() # Every countdown text changes
+
+    def preview_settings(self, settings):
+         # Shows the window with these settings without adopting them (live preview of the settings window).
+         # apply_settings() / preview_settings(self.settings) bring the real settings back.
 
          # Apply window size and position
-         win_width = self.settings.get('window_width', self.winfo_width())
-         win_height = self.settings.get('window_height', self.winfo_height())
-         win_x = self.settings.get('window_x', self.winfo_x())
-         win_y = self.settings.get('window_y', self.winfo_y())
+         win_width = settings.get('window_width', self.winfo_width())
+         win_height = settings.get('window_height', self.winfo_height())
+         win_x = settings.get('window_x', self.winfo_x())
+         win_y = settings.get('window_y', self.winfo_y())
 
          try:
              # Ensure values are integers and size is positive
@@ -228,28 +336,32 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
              if win_height < min_content_height:
                   win_height = min_content_height
 
-             self.geometry(f"{win_width}x{win_height}+{int(win_x)}+{int(win_y)}")
+             geometry = f"{win_width}x{win_height}+{int(win_x)}+{int(win_y)}"
+             if self._settings_changed('geometry', geometry):
+                 self.geometry(geometry)
          except Exception as e:
               print(f"应用窗口几何设置失败: {e}")
               # Fallback or error handling
 
          # Apply color settings
-         bg_color = self.settings.get('bg_color', 'black')
-         fg_color = self.settings.get('fg_color', 'white')
+         bg_color = settings.get('bg_color', 'black')
+         fg_color = settings.get('fg_color', 'white')
          # Validate colors? Tkinter handles many formats.
-         self.config(bg=bg_color) # Window background
-         self.main_frame.config(bg=bg_color) # Frame background
-         self.title_label.config(bg=bg_color, fg=fg_color) # Label colors
-         self.ddl_list_label.config(bg=bg_color, fg=fg_color) # Label colors
+         if self._settings_changed('colors', (bg_color, fg_color)):
+             self.config(bg=bg_color) # Window background
+             self.main_frame.config(bg=bg_color) # Frame background
+             self.title_label.config(bg=bg_color, fg=fg_color) # Label colors
+             self.ddl_list_view.set_colors(bg_color, fg_color) # List view colors
 
          # Apply font settings
-         self._update_label_font()
+         self._update_label_font(settings)
 
          # Apply transparency setting
-         alpha = self.settings.get('alpha', 1.0) # Default opaque
+         alpha = settings.get('alpha', 1.0) # Default opaque
          try:
              alpha = max(0.0, min(1.0, float(alpha))) # Clamp alpha between 0.0 and 1.0
-             self.attributes('-alpha', alpha)
+             if self._settings_changed('alpha', alpha):
+                 self.attributes('-alpha', alpha)
          except Exception as e:
               print(f"应用透明度设置失败: {e}")
 
@@ -279,111 +391,105 @@ class DisplayWindow(ThemedTk): # 现在 DisplayWindow 继承自 ThemedTk
 
 
     def update_display(self):
-        # Calculate and format the text to be displayed
-        now = datetime.now()
-        display_items_text = "" # Text for the DDL list label
-
-        if isinstance(self.ddl_items, list):
-            valid_ddls = []
-            invalid_ddls_text = ""
-            for item in self.ddl_items:
-                 item_name = item.get('name', '未命名项目')
-                 item_date_str = item.get('date')
-
-                 if not item_date_str:
-                     invalid_ddls_text += f"- {item_name}: 未设置日期\n"
-                     continue
-
-                 try:
-                     ddl_time = datetime.strptime(item_date_str, '%Y-%m-%d %H:%M')
-                     valid_ddls.append((item_name, ddl_time))
-                 except ValueError:
-                     invalid_ddls_text += f"- {item_name}: 无效日期格式 '{item_date_str}'\n"
-                 except Exception as e:
-                     invalid_ddls_text += f"- {item_name}: 处理日期出错 ({e})\n"
-
-
-            # Sort valid items by due date
-            sorted_ddls = sorted(valid_ddls, key=lambda x: x[1])
-
-            for item_name, ddl_time in sorted_ddls:
-                time_diff: timedelta = ddl_time - now
-
-                # Format due date (YYYY-MM-DD HH:MM or MM-DD HH:MM if same year)
-                current_year = now.year
-                ddl_year = ddl_time.year
-
-                if current_year != ddl_year:
-                    ddl_date_formatted = ddl_time.strftime('%Y-%m-%d %H:%M')
-                else:
-                    ddl_date_formatted = ddl_time.strftime('%m-%d %H:%M')
-
-
-                # Format time left
-                if time_diff.total_seconds() < 0:
-                    # Overdue
-                    total_seconds_overdue = abs(time_diff.total_seconds())
-                    days_overdue = int(total_seconds_overdue // (24 * 3600))
-                    hours_overdue = int((total_seconds_overdue % (24 * 3600)) // 3600)
-                    minutes_overdue = int((total_seconds_overdue % 3600) // 60)
-
-                    time_left_str = ""
-                    if days_overdue > 0:
-                         time_left_str += f"已过期 {days_overdue}天 "
-                         if hours_overdue > 0: time_left_str += f"{hours_overdue}小时"
-                    elif hours_overdue > 0:
-                         time_left_str += f"已过期 {hours_overdue}小时 "
-                         if minutes_overdue > 0: time_left_str += f"{minutes_overdue}分钟"
-                    elif minutes_overdue > 0:
-                         time_left_str += f"已过期 {minutes_overdue}分钟"
-                    elif total_seconds_overdue > 0:
-                         time_left_str += "已过期不足1分钟"
-                    else:
-                         time_left_str = "已过期"
-
-
-                    display_items_text += f"- {item_name} ({ddl_date_formatted}) : {time_left_str.strip()}\n"
-
-                else:
-                    # Not overdue
-                    days = time_diff.days
-                    seconds_rem = time_diff.seconds
-                    hours, remainder = divmod(seconds_rem, 3600)
-                    minutes, seconds = divmod(remainder, 60)
-
-                    time_str = ""
-                    if days > 0:
-                        time_str += f"{days}天"
-                        if hours > 0:
-                             time_str += f" {hours}小时"
-                    elif hours > 0:
-                        time_str += f"{hours}小时"
-                        if minutes > 0:
-                            time_str += f" {minutes}分钟"
-                    elif minutes > 0:
-                        time_str += f"{minutes}分钟"
-                    elif seconds > 0:
-                        time_str += f"不足1分钟"
-
-                    if not time_str.strip():
-                         time_str = "很快了！"
-
-                    display_items_text += f"- {item_name} ({ddl_date_formatted}) : 剩余{time_str.strip()}\n"
-
-            # Add invalid items information
-            if invalid_ddls_text:
-                 if display_items_text: # Add separator if there are valid items
-                     display_items_text += "\n---\n"
-                 display_items_text += invalid_ddls_text
-
-        else:
-            display_items_text += "错误：截止日期数据格式不正确。"
-
-        self.ddl_list_label.config(text=display_items_text.strip()) # Update Label text
-
-        # Schedule the next update in 60000 milliseconds (1 minute)
-        self.after(60000, self.update_display)
+        # Redraw now (e.g. after the DDL list was changed in the settings window).
+        # The scheduler cancels the pending timer and re-arms it, so calling this
+        # repeatedly never starts a second update loop.
+        self.refresh_scheduler.refresh_now()
+
+    def _render_ddl_list(self):
+        # Parsing and sorting are done once by the DeadlineEngine (when items change),
+        # the list view only asks it for the rows that are currently visible
+        self.ddl_list_view.refresh(datetime.now())
+
+    def watch_background_saves(self):
+        # Polls the results of background saves while any are outstanding, and reports failures.
+        # Only one poll chain runs at a time; it stops once all saves have finished.
+        if getattr(self, '_save_poll_id', None) is not None:
+            return
+        self._poll_background_saves()
+
+    def _poll_background_saves(self):
+        self._save_poll_id = None
+        for name, error in self.data_manager.get_save_results():
+            if error is not None:
+                what = "DDL 项目" if name == 'ddl_items' else "设置"
+                messagebox.showerror("保存失败", f"保存{what}时出错：\n{error}")
+        if self.data_manager.has_pending_saves():
+            self._save_poll_id = self.after(SAVE_POLL_MS, self._poll_background_saves)
+
+    def _check_data_file(self):
+        # Only the changed items are re-indexed by the engine; one redraw for the whole reload
+        if self.data_manager.reload_ddl_items_if_changed():
+            self.update_display()
+        self.after(FILE_POLL_MS, self._check_data_file)
 
     def schedule_update(self):
-         # Initial delay, then start the update loop
-         self.after(1000, self.update_display) # Delay 1 second for first update
\ No newline at end of file
+         # Single refresh timer, wakes up at the next minute/hour boundary where a countdown changes
+         self.refresh_scheduler = RefreshScheduler(self, self._render_ddl_list, self.engine.next_change)
+         # First update as soon as the window is idle (the items are already indexed), then the update loop
+         self.after_idle(self.refresh_scheduler.refresh_now)
+
+    def schedule_reminders(self):
+         # All reminders share one heap and one pending timer, see ReminderScheduler.
+         # Filled after the first paint; item edits reach it through the data manager listener.
+         self.reminder_scheduler = ReminderScheduler(self, self.show_reminder,
+                                                     self.settings.get('reminder_minutes', DEFAULT_REMINDER_MINUTES))
+         self.data_manager.add_listener(self.reminder_scheduler.on_data_change)
+         self.after_idle(lambda: self.reminder_scheduler.load(self.data_manager.get_ddl_items()))
+
+    def show_reminder(self, item, minutes_before, due):
+         # Flashes the overlay and (unless disabled) shows a toast below it
+         name = item.get('name', '未命名')
+         if minutes_before == 0:
+             message = f"「{name}」已到截止时间 ({due:%m-%d %H:%M})"
+         else:
+             message = f"「{name}」将在{describe_minutes(minutes_before)}后截止 ({due:%m-%d %H:%M})"
+         self.flash()
+         if self.settings.get('reminder_toast', True):
+             self._show_toast(message)
+
+    def flash(self, count=FLASH_COUNT):
+         # One after chain; a reminder during a running flash just restarts the count
+         self._flash_remaining = count
+         if getattr(self, '_flash_after_id', None) is None:
+             self._flash_step()
+
+    def _flash_step(self):
+         self._flash_after_id = None
+         # Read every step, so colors applied meanwhile are the ones restored at the end
+         bg_color, fg_color = self._applied.get('colors', ('black', 'white'))
+         if self._flash_remaining <= 0:
+             self.ddl_list_view.set_colors(bg_color, fg_color)
+             self.config(bg=bg_color)
+             self.main_frame.config(bg=bg_color)
+             self.title_label.config(bg=bg_color, fg=fg_color)
+             return
+         if self._flash_remaining % 2 == 0: # Swapped colors on every other step
+             bg_color, fg_color = fg_color, bg_color
+         self.config(bg=bg_color)
+         self.main_frame.config(bg=bg_color)
+         self.title_label.config(bg=bg_color, fg=fg_color)
+         self.ddl_list_view.set_colors(bg_color, fg_color)
+         self._flash_remaining -= 1
+         self._flash_after_id = self.after(FLASH_MS, self._flash_step)
+
+    def _show_toast(self, message):
+         toast = tk.Toplevel(self)
+         toast.overrideredirect(True)
+         toast.attributes('-topmost', True)
+         bg_color, fg_color = self._applied.get('colors', ('black', 'white'))
+         label = tk.Label(toast, text=message, bg=fg_color, fg=bg_color, padx=10, pady=6,
+                          font=self.title_label.cget('font'), wraplength=max(self.winfo_width(), 200))
+         label.pack()
+         # Stacked below the overlay and below earlier toasts that are still open
+         self._toasts = [other for other in getattr(self, '_toasts', []) if other.winfo_exists()]
+         toast.update_idletasks()
+         offset = sum(other.winfo_height() + 4 for other in self._toasts)
+         toast.geometry(f"+{self.winfo_x()}+{self.winfo_y() + self.winfo_height() + 4 + offset}")
+         self._toasts.append(toast)
+
+         def close(event=None):
+             toast.after_cancel(close_after_id)
+             toast.destroy()
+         close_after_id = toast.after(TOAST_MS, close)
+         label.bind("<Button-1>", close)
\ No newline at end of file
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from tkinter import font as tkFont
+
+# Fonts kept alive besides the one in use, so switching back and forth in the
+# settings preview doesn't create them again
+MAX_UNUSED_FONTS = 4
+
+
+class FontCache:
+    """
+    Reuses tkFont.Font objects keyed by (family, size, weight).
+
+    Every tkFont.Font() registers a named font in the Tcl interpreter and
+    queries its metrics. The cache creates each font once and deletes the
+    least recently used ones beyond MAX_UNUSED_FONTS. Metrics are cached per
+    font, so layout code doesn't have to ask Tk again.
+    """
+
+    def __init__(self, root, max_unused=MAX_UNUSED_FONTS):
+        self.root = root
+        self.max_unused = max_unused
+        self._fonts = OrderedDict() # key -> Font, least recently used first
+        self._metrics = {} # key -> dict of font.metrics()
+
+    def get(self, family, size, weight='normal'):
+        """
+        Returns the Font for these attributes, creating it on first use.
+        Raises tkFont.TclError like tkFont.Font() if the font can't be created.
+        """
+        key = (family, int(size), weight)
+        font = self._fonts.get(key)
+        if font is None:
+            font = tkFont.Font(root=self.root, family=family, size=key[1], weight=weight)
+            self._fonts[key] = font
+        self._fonts.move_to_end(key)
+        self._prune()
+        return font
+
+    def metrics(self, font):
+        """Returns font.metrics() (ascent, descent, linespace, fixed), queried once per font."""
+        key = self._key_of(font)
+        cached = self._metrics.get(key)
+        if cached is None:
+            cached = self._metrics[key] = font.metrics()
+        return cached
+
+    def _key_of(self, font):
+        for key, cached_font in self._fonts.items():
+            if cached_font is font:
+                return key
+        # Not created by this cache: use the font's actual attributes
+        return (font.actual('family'), font.actual('size'), font.actual('weight'))
+
+    def _prune(self):
+        # The most recently used font is the one in use, keep max_unused others
+        while len(self._fonts) > self.max_unused + 1:
+            key, font = self._fonts.popitem(last=False)
+            self._metrics.pop(key, None)
+            # Deletes the named font from Tcl; widgets still showing it keep it until they switch
+            del font
@@ -1,27 +1,66 @@
 import tkinter as tk
-from tkinter import ttk, simpledialog, messagebox, colorchooser, font as tkFont
+from tkinter import ttk, simpledialog, messagebox, colorchooser, filedialog, font as tkFont
 from datetime import datetime
+import csv
 import os
 import sys
 
-# Needs tkcalendar: pip install tkcalendar
-from tkcalendar import DateEntry
+# Needs tkcalendar: pip install tkcalendar (imported when the add/edit dialog is first opened)
 # Needs ttkthemes: pip install ttkthemes
 # from ttkthemes import ThemedTk # Not used directly here, used by parent
 
 # Get the command for auto-start (handles script vs frozen mode)
 from utils.system_helper import set_auto_start, is_auto_start_enabled, get_auto_start_command
+from utils.importer import import_file
+from utils.recurrence import FREQUENCIES, FREQUENCY_NAMES, describe_rule
+from utils.reminder_scheduler import DEFAULT_REMINDER_MINUTES, parse_reminder_minutes, format_reminder_minutes
+from utils.countdown_format import DEFAULT_LOCALE, LOCALE_NAMES
+
+# Live preview: field changes are collected and applied to the main window at most once per frame
+PREVIEW_FRAME_MS = 16
+
+# Fallback if the themes can't be listed (e.g. the parent is not a ThemedTk)
+FALLBACK_THEMES = ['clam', 'default']
+
+# Process-wide caches: listing the fonts and themes is slow on machines with many fonts,
+# and neither changes while the application runs
+_font_families = None
+_themes = None
+
+
+def get_font_families(widget):
+    """Returns the sorted font families of the system (listed once per process)."""
+    global _font_families
+    if _font_families is None:
+        _font_families = sorted(set(tkFont.families(widget)))
+    return _font_families
+
+
+def get_themes(parent):
+    """Returns the sorted ttk themes available in the parent ThemedTk (listed once per process)."""
+    global _themes
+    if _themes is None:
+        # Wrap in try-except in case ttkthemes is not fully functional or parent is not ThemedTk
+        try:
+            _themes = sorted(parent.get_themes())
+        except Exception as e:
+            print(f"Error getting themes from parent: {e}")
+            return list(FALLBACK_THEMES) # Not cached, try again next time
+    return _themes
 
 class SettingsWindow(tk.Toplevel):
-    def __init__(self, parent, ddl_items, settings, data_manager):
+    def __init__(self, parent, settings, data_manager):
         tk.Toplevel.__init__(self, parent)
         self.parent = parent # Save parent window reference (DisplayWindow instance)
-        # Note: ddl_items and settings are references from parent, direct modifications
-        # will affect parent's objects. This is intended for the "Apply" button.
-        self.ddl_items = ddl_items
+        # Note: settings is a reference from parent, direct modifications
+        # will affect parent's object. This is intended for the "Apply" button.
         self.settings = settings
 
+        # DDL items are added / edited / deleted through the data manager (looked up by item id)
         self.data_manager = data_manager
+        # Parsed and sorted deadline set shared with the display window (see utils/deadline_engine.py),
+        # it follows the data manager's changes and notifies the Treeview
+        self.engine = parent.engine
 
         self.title("DDL 工具设置")
         # self.geometry("500x400") # Can set a default size
@@ -62,16 +101,50 @@ class SettingsWindow(tk.Toplevel):
         self.edit_button.pack(pady=5, fill="x")
         self.delete_button = ttk.Button(button_frame, text="删除", command=self.delete_ddl, state=tk.DISABLED)
         self.delete_button.pack(pady=5, fill="x")
+        ttk.Button(button_frame, text="导入...", command=self.import_ddls).pack(pady=5, fill="x")
 
         # Bind treeview selection event to enable edit/delete buttons
         self.ddl_tree.bind('<<TreeviewSelect>>', self.on_tree_select)
 
         # Load initial data into Treeview
         self._load_ddls_to_treeview()
+        # Afterwards keep it in sync row by row with the changes of the deadline set
+        self.engine.subscribe(self._on_ddl_change)
 
         # --- Application Settings Tab ---
+        # Built on first selection (see _build_settings_tab), so the window opens without
+        # listing the fonts and themes if only the DDL list is needed
         self.settings_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(self.settings_frame, text='外观设置')
+        self._settings_tab_built = False
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+        # Live preview: setting key -> valid value typed / selected but not shown yet
+        self._preview_delta = {}
+        self._preview_values = {} # All previewed values since the last apply / save
+        self._preview_after_id = None
+
+        # --- Bottom operation buttons ---
+        bottom_button_frame = ttk.Frame(self)
+        bottom_button_frame.pack(pady=10)
+
+        # Add "Apply" button
+        ttk.Button(bottom_button_frame, text="应用", command=self.apply_settings_preview).pack(side="left", padx=5)
+        ttk.Button(bottom_button_frame, text="保存并关闭", command=self.save_and_close).pack(side="left", padx=5)
+        ttk.Button(bottom_button_frame, text="取消", command=self.cancel_and_close).pack(side="left", padx=5)
+
+        # Handle window closing event (clicking the X button)
+        self.protocol("WM_DELETE_WINDOW", self.cancel_and_close)
+
+
+    def _on_tab_changed(self, event):
+        if self.notebook.select() == str(self.settings_frame):
+            self._build_settings_tab()
+
+    def _build_settings_tab(self):
+        # Creates the widgets of the '外观设置' tab and fills them from the settings (only once)
+        if self._settings_tab_built:
+            return
+        self._settings_tab_built = True
 
         # Use grid layout for settings area
         row = 0
@@ -93,8 +166,8 @@ class SettingsWindow(tk.Toplevel):
 
         # Font settings
         ttk.Label(self.settings_frame, text="字体家族:").grid(row=row, column=0, sticky="w", pady=2, padx=5)
-        # Provide a dropdown list to select system fonts
-        available_fonts = sorted(tkFont.families())
+        # Provide a dropdown list to select system fonts (cached for the whole process)
+        available_fonts = get_font_families(self)
         self.font_family_combo = ttk.Combobox(self.settings_frame, values=available_fonts, state='readonly')
         self.font_family_combo.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2, padx=5)
         row += 1
@@ -134,24 +207,31 @@ class SettingsWindow(tk.Toplevel):
 
         # Theme setting
         ttk.Label(self.settings_frame, text="主题:").grid(row=row, column=0, sticky="w", pady=2, padx=5)
-        # Get available themes from the parent (ThemedTk instance)
-        # Wrap in try-except in case ttkthemes is not fully functional or parent is not ThemedTk
-        available_themes = []
-        if hasattr(self.parent, 'get_themes'):
-             try:
-                  available_themes = sorted(self.parent.get_themes())
-             except Exception as e:
-                  print(f"Error getting themes from parent: {e}")
-                  available_themes = ['clam', 'default'] # Provide basic fallbacks
-        else:
-             available_themes = ['clam', 'default'] # Provide basic fallbacks
-
+        # Get available themes from the parent (ThemedTk instance), cached for the whole process
+        available_themes = get_themes(self.parent)
 
         self.theme_combo = ttk.Combobox(self.settings_frame, values=available_themes, state='readonly')
         self.theme_combo.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2, padx=5)
         row += 1
 
 
+        # Countdown language
+        ttk.Label(self.settings_frame, text="倒计时语言:").grid(row=row, column=0, sticky="w", pady=2, padx=5)
+        self.locale_combo = ttk.Combobox(self.settings_frame, values=list(LOCALE_NAMES.values()), state='readonly', width=8)
+        self.locale_combo.grid(row=row, column=1, sticky="w", pady=2, padx=5)
+        row += 1
+
+        # Reminders (minutes before each deadline, items can override them in the add/edit dialog)
+        ttk.Label(self.settings_frame, text="提醒 (截止前分钟数):").grid(row=row, column=0, sticky="w", pady=2, padx=5)
+        self.reminder_entry = ttk.Entry(self.settings_frame)
+        self.reminder_entry.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2, padx=5)
+        row += 1
+
+        self.reminder_toast_var = tk.BooleanVar()
+        self.reminder_toast_check = ttk.Checkbutton(self.settings_frame, text="提醒时弹出提示", variable=self.reminder_toast_var)
+        self.reminder_toast_check.grid(row=row, column=0, columnspan=3, sticky="w", pady=2, padx=5)
+        row += 1
+
         # Auto-start setting
         self.auto_start_var = tk.BooleanVar()
         # Checkbutton variable is linked in _load_current_settings_to_gui
@@ -166,22 +246,88 @@ class SettingsWindow(tk.Toplevel):
 
         # --- Populate GUI with current settings ---
         self._load_current_settings_to_gui()
-
-        # --- Bottom operation buttons ---
-        bottom_button_frame = ttk.Frame(self)
-        bottom_button_frame.pack(pady=10)
-
-        # Add "Apply" button
-        ttk.Button(bottom_button_frame, text="应用", command=self.apply_settings_preview).pack(side="left", padx=5)
-        ttk.Button(bottom_button_frame, text="保存并关闭", command=self.save_and_close).pack(side="left", padx=5)
-        ttk.Button(bottom_button_frame, text="取消", command=self.cancel_and_close).pack(side="left", padx=5)
-
-        # Handle window closing event (clicking the X button)
-        self.protocol("WM_DELETE_WINDOW", self.cancel_and_close)
+        self._bind_live_preview()
+
+    def _bind_live_preview(self):
+        # Setting key -> (widget, parser). A parser raises ValueError for input that can't be previewed yet,
+        # e.g. a half-typed or empty number, which is then just ignored.
+        def positive_int(text):
+            value = int(text)
+            if value <= 0:
+                raise ValueError(text)
+            return value
+
+        def non_empty(text):
+            if not text:
+                raise ValueError(text)
+            return text
+
+        def alpha_value(text):
+            value = float(text)
+            if not 0.0 <= value <= 1.0:
+                raise ValueError(text)
+            return value
+
+        self._preview_fields = {
+            'window_x': (self.pos_x_entry, int),
+            'window_y': (self.pos_y_entry, int),
+            'window_width': (self.size_width_entry, positive_int),
+            'window_height': (self.size_height_entry, positive_int),
+            'font_size': (self.font_size_spinbox, positive_int),
+            'alpha': (self.alpha_spinbox, alpha_value),
+            'font_family': (self.font_family_combo, non_empty),
+            'font_weight': (self.font_weight_combo, non_empty),
+        }
+        for key, (widget, _) in self._preview_fields.items():
+            callback = lambda event, key=key: self._on_preview_field_changed(key)
+            if isinstance(widget, ttk.Combobox):
+                widget.bind('<<ComboboxSelected>>', callback, add='+')
+            else:
+                widget.bind('<KeyRelease>', callback, add='+')
+                if isinstance(widget, ttk.Spinbox):
+                    # Arrow buttons / keys change the value without a key release of a character
+                    widget.bind('<<Increment>>', lambda event, key=key: self.after_idle(self._on_preview_field_changed, key), add='+')
+                    widget.bind('<<Decrement>>', lambda event, key=key: self.after_idle(self._on_preview_field_changed, key), add='+')
+
+    def _on_preview_field_changed(self, key):
+        widget, parse = self._preview_fields[key]
+        try:
+            value = parse(widget.get().strip())
+        except ValueError:
+            return # Not a valid value (yet), keep showing the last valid one
+        self._preview_delta[key] = value
+        self._schedule_preview()
+
+    def _schedule_preview(self):
+        # One pending callback at most: wait for the frame, then for the next idle cycle
+        if self._preview_after_id is None:
+            self._preview_after_id = self.after(PREVIEW_FRAME_MS, self._queue_preview_flush)
+
+    def _queue_preview_flush(self):
+        self._preview_after_id = self.after_idle(self._flush_preview)
+
+    def _flush_preview(self):
+        self._preview_after_id = None
+        if not self._preview_delta:
+            return
+        self._preview_values.update(self._preview_delta)
+        self._preview_delta = {}
+        # The main window only touches the properties that differ from what it shows
+        self.parent.preview_settings({**self.settings, **self._preview_values})
+
+    def _cancel_preview(self):
+        # Drops pending preview changes (the caller applies or reverts the real settings)
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+            self._preview_after_id = None
+        self._preview_delta = {}
+        self._preview_values = {}
 
 
     def _load_current_settings_to_gui(self):
         # Load settings from self.settings dictionary into GUI controls
+        if not self._settings_tab_built:
+            return # Filled when the tab is built
         # Window position/size gets actual current values from parent window, others from settings dict
         current_geo = self.parent.get_current_settings() # Get actual current settings from main window
 
@@ -235,6 +381,14 @@ class SettingsWindow(tk.Toplevel):
              self.theme_combo.set('') # No themes available?
 
 
+        # Countdown language
+        self.locale_combo.set(LOCALE_NAMES.get(self.settings.get('countdown_locale'), LOCALE_NAMES[DEFAULT_LOCALE]))
+
+        # Reminders
+        self.reminder_entry.delete(0, tk.END)
+        self.reminder_entry.insert(0, format_reminder_minutes(self.settings.get('reminder_minutes', DEFAULT_REMINDER_MINUTES)))
+        self.reminder_toast_var.set(self.settings.get('reminder_toast', True))
+
         # Auto-start setting
         auto_start_cmd = get_auto_start_command() # Get the correct command for current execution mode
         self.auto_start_var.set(is_auto_start_enabled("DDLTool", auto_start_cmd))
@@ -242,22 +396,41 @@ class SettingsWindow(tk.Toplevel):
 
 
     def _load_ddls_to_treeview(self):
-        # Clear Treeview
-        for i in self.ddl_tree.get_children():
-            self.ddl_tree.delete(i)
+        # Full (re)load, only used when the window opens or the whole deadline set was rebuilt.
+        # Single changes are applied by _on_ddl_change.
+        self.ddl_tree.delete(*self.ddl_tree.get_children())
 
         # Insert new data
-        # Sort by date
-        # Filter out items that are not dictionaries or missing keys before sorting
-        valid_ddl_items = [item for item in self.ddl_items if isinstance(item, dict) and 'name' in item and 'date' in item]
-
-        sorted_ddls = sorted(valid_ddl_items, key=lambda x: x.get('date', '')) # Use empty string as default key for missing dates
-
-        for item in sorted_ddls:
-             # item format: {"name": "...", "date": "..."}
-             # Store the original item dictionary reference as the item's tag.
-             # This makes it easy to retrieve the original data object for editing/deletion.
-             self.ddl_tree.insert('', tk.END, values=(item.get('name', '未命名项目'), item.get('date', '未设置日期')), tags=(item,))
+        # The engine already holds the items sorted by due date (items with invalid dates come last)
+        for item_id in self.engine.sorted_item_ids():
+             # The row iid is the stable item id, the item itself is looked up through the engine
+             self.ddl_tree.insert('', tk.END, iid=item_id, values=self._tree_values(item_id))
+
+    def _tree_values(self, item_id):
+        item = self.data_manager.get_ddl_item(item_id)
+        if item is None:
+            return ('未命名项目', '未设置日期')
+        # item format: {"name": "...", "date": "...", "repeat": {...} (optional)}
+        date_str = item.get('date', '未设置日期')
+        repeat_str = describe_rule(item.get('repeat'))
+        return (item.get('name', '未命名项目'), f"{date_str} ({repeat_str})" if repeat_str else date_str)
+
+    def _on_ddl_change(self, action, item_id, index, old_index):
+        # Apply a single change of the deadline set to the Treeview (see DeadlineEngine._notify)
+        if action == 'reset':
+            self._load_ddls_to_treeview()
+        elif action == 'insert':
+            self.ddl_tree.insert('', index, iid=item_id, values=self._tree_values(item_id))
+        elif action == 'delete':
+            if self.ddl_tree.exists(item_id):
+                self.ddl_tree.delete(item_id)
+        elif action == 'update':
+            self.ddl_tree.item(item_id, values=self._tree_values(item_id))
+        elif action == 'move':
+            self.ddl_tree.item(item_id, values=self._tree_values(item_id))
+            # Detach first, so 'index' counts the other rows only (it's the final position)
+            self.ddl_tree.detach(item_id)
+            self.ddl_tree.move(item_id, '', index)
 
 
     def on_tree_select(self, event):
@@ -270,19 +443,19 @@ class SettingsWindow(tk.Toplevel):
             self.edit_button.config(state=tk.DISABLED)
             self.delete_button.config(state=tk.DISABLED)
 
-    def get_selected_ddl_data(self):
-        # Get the original data object for the selected item (using tag)
+    def get_selected_ddl_id(self):
+        # The Treeview row iid is the item id
         selected_items = self.ddl_tree.selection()
         if not selected_items:
             return None
+        return selected_items[0]
 
-        item_id = selected_items[0]
-        # Retrieve the tag, which is the original dictionary object
-        # Check if tags exist and are not empty
-        tags = self.ddl_tree.item(item_id, 'tags')
-        if tags and tags[0]:
-            return tags[0] # Return the stored object reference
-        return None # No valid tag found
+    def get_selected_ddl_data(self):
+        # Get the original data object for the selected item (by its id)
+        item_id = self.get_selected_ddl_id()
+        if item_id is None:
+            return None
+        return self.data_manager.get_ddl_item(item_id)
 
 
     def add_ddl(self):
@@ -309,18 +482,36 @@ class SettingsWindow(tk.Toplevel):
 
          if messagebox.askyesno("确认删除", f"确定要删除项目 '{original_item_data.get('name', '未命名')}' 吗？"):
              try:
-                  # Find the exact object reference in the original list and remove it
-                  # Using item_data reference directly assumes it's still in the list
-                  self.ddl_items.remove(original_item_data) # Remove by object identity
+                  # Delete by id. The engine (and through it the Treeview) follows the data manager's change.
+                  self.data_manager.delete_ddl_item(original_item_data['id'])
 
-                  self._load_ddls_to_treeview() # Refresh Treeview display
                   self.on_tree_select(None) # Update button states (disables Edit/Delete)
                   # messagebox.showinfo("成功", "项目已删除（需保存设置生效）。")
-             except ValueError:
-                  messagebox.showerror("错误", "删除项目失败：在数据列表中未找到匹配项。") # Indicates an issue with the item reference
+             except KeyError:
+                  messagebox.showerror("错误", "删除项目失败：在数据列表中未找到匹配项。") # Item was already deleted
              except Exception as e:
                   messagebox.showerror("错误", f"删除项目失败: {e}")
 
+    def import_ddls(self):
+         # Bulk import from a calendar export (.ics) or a spreadsheet (.csv)
+         file_path = filedialog.askopenfilename(parent=self, title="导入截止日期",
+                                                filetypes=[("日历和表格文件", "*.ics *.csv"), ("iCalendar", "*.ics"),
+                                                           ("CSV", "*.csv"), ("所有文件", "*.*")])
+         if not file_path:
+             return
+         try:
+             # The Treeview follows the added items through the engine; saved once below
+             result = import_file(self.data_manager, file_path, save=False)
+         except (OSError, ValueError, csv.Error) as e:
+             messagebox.showerror("导入失败", f"无法导入文件:\n{e}", parent=self)
+             return
+         if result.imported:
+             self.data_manager.request_save_ddl_items()
+             self.parent.watch_background_saves()
+             self.parent.update_display()
+         messagebox.showinfo("导入完成", f"导入 {result.imported} 项\n跳过重复 {result.duplicates} 项\n无效 {result.invalid} 项",
+                             parent=self)
+
     def _open_add_edit_dialog(self, item_data=None):
         dialog = AddEditDDLDialog(self, item_data)
         # wait_window makes the dialog modal and blocks here until dialog is destroyed
@@ -330,23 +521,23 @@ class SettingsWindow(tk.Toplevel):
         if hasattr(dialog, 'result') and dialog.result:
              new_item_data = dialog.result # Format: {"name": "...", "date": "..."}
 
+             # The engine (and through it the Treeview) follows the data manager's changes
              if item_data is None: # This was an Add operation
-                 self.ddl_items.append(new_item_data)
+                 self.data_manager.add_ddl_item(new_item_data) # Assigns the item id
                  messagebox.showinfo("成功", "项目已新增（需保存设置生效）。")
              else: # This was an Edit operation
-                 # Find the original item in the list by reference and update it
+                 # Update the original item (looked up by its id) in place
                  try:
-                      # index() finds the position of the exact object reference
-                      index = self.ddl_items.index(item_data)
-                      self.ddl_items[index] = new_item_data # Replace old object with new data object
+                      # None removes the repeat rule / own reminders if the dialog turned them off
+                      self.data_manager.update_ddl_item(item_data['id'], {'repeat': None, 'reminders': None, **new_item_data})
                       messagebox.showinfo("成功", "项目已更新（需保存设置生效）。")
-                 except ValueError:
-                      messagebox.showerror("错误", "更新项目失败：在数据列表中未找到原始项目。") # Indicates an issue with the item reference
+                 except KeyError:
+                      messagebox.showerror("错误", "更新项目失败：在数据列表中未找到原始项目。") # Item was deleted meanwhile
                  except Exception as e:
                      messagebox.showerror("错误", f"更新项目失败: {e}")
 
 
-             self._load_ddls_to_treeview() # Refresh Treeview display
+             # The Treeview row was inserted / updated through the engine's change notification
              self.on_tree_select(None) # Update button states (disables Edit/Delete)
 
 
@@ -357,6 +548,8 @@ class SettingsWindow(tk.Toplevel):
         if color_code and color_code[1]: # If user selected a color and didn't cancel
             selected_color_hex = color_code[1]
             self.fg_color_preview.config(bg=selected_color_hex)
+            self._preview_delta['fg_color'] = selected_color_hex
+            self._schedule_preview()
 
     def choose_bg_color(self):
         # Open color chooser, returns (RGB tuple, #HEX string)
@@ -365,10 +558,15 @@ class SettingsWindow(tk.Toplevel):
         if color_code and color_code[1]: # If user selected a color and didn't cancel
             selected_color_hex = color_code[1]
             self.bg_color_preview.config(bg=selected_color_hex)
+            self._preview_delta['bg_color'] = selected_color_hex
+            self._schedule_preview()
 
 
     def apply_settings_from_gui(self):
          # Read settings from GUI controls and update self.settings dictionary (does NOT save to file)
+         if not self._settings_tab_built:
+             return True # Tab never opened, nothing was changed
+         self._cancel_preview() # The fields are read in full below
          updated_settings = self.settings.copy() # Create a copy to modify
          valid_input = True
 
@@ -437,6 +635,18 @@ class SettingsWindow(tk.Toplevel):
               messagebox.showwarning("输入错误", "请选择一个有效的主题。")
               valid_input = False
 
+         # Countdown language
+         locales = {locale_name: locale for locale, locale_name in LOCALE_NAMES.items()}
+         updated_settings['countdown_locale'] = locales.get(self.locale_combo.get(), DEFAULT_LOCALE)
+
+         # Reminders
+         try:
+             updated_settings['reminder_minutes'] = parse_reminder_minutes(self.reminder_entry.get())
+         except ValueError:
+             messagebox.showwarning("输入错误", "提醒时间无效，请输入以逗号分隔的分钟数 (例如 1440, 60, 10)。")
+             valid_input = False
+         updated_settings['reminder_toast'] = self.reminder_toast_var.get()
+
 
          if valid_input:
              # If all inputs are valid, update the self.settings dictionary with the new values
@@ -475,17 +685,21 @@ class SettingsWindow(tk.Toplevel):
     def save_and_close(self):
         # "Save and Close" button function: apply settings, save all data to files, handle auto-start, then close window
         if self.apply_settings_from_gui(): # First, read from GUI and update self.settings
-             # Process auto-start setting
-             auto_start_enabled = self.auto_start_var.get()
-             current_auto_start_command = get_auto_start_command() # Get the correct command for current execution mode
-             set_auto_start("DDLTool", current_auto_start_command, auto_start_enabled)
-             # Update the auto_start state in self.settings dictionary to be saved
-             self.settings['auto_start'] = auto_start_enabled
-
-
-             # Save DDL items and settings to files
-             self.data_manager.save_ddl_items(self.ddl_items)
-             self.data_manager.save_settings(self.settings)
+             # Process auto-start setting (only shown, and so only changeable, on the settings tab)
+             if self._settings_tab_built:
+                 auto_start_enabled = self.auto_start_var.get()
+                 current_auto_start_command = get_auto_start_command() # Get the correct command for current execution mode
+                 if auto_start_enabled != is_auto_start_enabled("DDLTool", current_auto_start_command):
+                     set_auto_start("DDLTool", current_auto_start_command, auto_start_enabled)
+                 # Update the auto_start state in self.settings dictionary to be saved
+                 self.settings['auto_start'] = auto_start_enabled
+
+
+             # Save DDL items and settings to files, on the background writer thread.
+             # The main window reports a failed save once the writer is done.
+             self.data_manager.request_save_ddl_items()
+             self.data_manager.request_save_settings(self.settings)
+             self.parent.watch_background_saves()
 
              # Call parent window methods to apply settings one last time before closing
              # Set theme first
@@ -499,15 +713,27 @@ class SettingsWindow(tk.Toplevel):
 
              self.parent.apply_settings(self.settings)
 
-             messagebox.showinfo("保存成功", "设置和项目已保存。")
+             messagebox.showinfo("保存成功", "设置和项目正在后台保存。")
              self.destroy() # Close the window
         # else: apply_settings_from_gui will show error, window stays open
 
+    def destroy(self):
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+            self._preview_after_id = None
+        # Stop mirroring the deadline set before the Treeview goes away
+        self.engine.unsubscribe(self._on_ddl_change)
+        tk.Toplevel.destroy(self)
+
     def cancel_and_close(self):
         # "Cancel" button function: does NOT save to files, just closes the window
-        # Changes made to ddl_items and settings (which are references) will persist in the parent's objects in memory.
+        # Changes made to the DDL items (in the data manager) and settings (a reference) will persist in memory.
         # Only the *file* save is skipped.
         # Applied settings preview will remain visible in the main window until application restart.
+        # Live preview of values that were never applied is reverted.
+        if self._preview_values or self._preview_delta:
+            self._cancel_preview()
+            self.parent.preview_settings(self.settings)
         self.grab_release() # Release modal grab
         self.destroy()
 
@@ -543,6 +769,7 @@ class AddEditDDLDialog(tk.Toplevel):
         ttk.Label(form_frame, text="截止日期:").grid(row=1, column=0, sticky="w", pady=5, padx=5)
         # locale='zh_CN' If system supports Chinese locale, might show Chinese calendar
         # date_pattern ensures saved string format is correct
+        from tkcalendar import DateEntry
         self.date_entry = DateEntry(form_frame, selectmode='day', date_pattern='yyyy-mm-dd', locale='zh_CN', font='Arial 10')
         self.date_entry.grid(row=1, column=1, columnspan=2, sticky="ew", pady=5, padx=5)
 
@@ -560,6 +787,29 @@ class AddEditDDLDialog(tk.Toplevel):
         self.minute_spinbox = ttk.Spinbox(time_frame, from_=0, to=59, width=3, format="%02.0f", wrap=True)
         self.minute_spinbox.pack(side="left")
 
+        # 重复 (频率, 间隔, 可选的次数; 为空表示一直重复)
+        ttk.Label(form_frame, text="重复:").grid(row=3, column=0, sticky="w", pady=5, padx=5)
+        repeat_frame = ttk.Frame(form_frame)
+        repeat_frame.grid(row=3, column=1, columnspan=2, sticky="w", pady=5, padx=5)
+        self.repeat_choices = ['不重复'] + [FREQUENCY_NAMES[freq] for freq in FREQUENCIES]
+        self.repeat_combobox = ttk.Combobox(repeat_frame, values=self.repeat_choices, state="readonly", width=6)
+        self.repeat_combobox.set(self.repeat_choices[0])
+        self.repeat_combobox.pack(side="left")
+        ttk.Label(repeat_frame, text="间隔:").pack(side="left", padx=(10, 0))
+        self.interval_spinbox = ttk.Spinbox(repeat_frame, from_=1, to=99, width=3)
+        self.interval_spinbox.set("1")
+        self.interval_spinbox.pack(side="left")
+        ttk.Label(repeat_frame, text="次数:").pack(side="left", padx=(10, 0))
+        self.count_entry = ttk.Entry(repeat_frame, width=5)
+        self.count_entry.pack(side="left")
+
+        # 提醒 (截止前分钟数, 逗号分隔; 为空使用设置中的默认提醒)
+        ttk.Label(form_frame, text="提醒 (分钟):").grid(row=4, column=0, sticky="w", pady=5, padx=5)
+        self.reminder_entry = ttk.Entry(form_frame, width=20)
+        self.reminder_entry.grid(row=4, column=1, sticky="w", pady=5, padx=5)
+        self.no_reminder_var = tk.BooleanVar()
+        ttk.Checkbutton(form_frame, text="不提醒", variable=self.no_reminder_var).grid(row=4, column=2, sticky="w", pady=5, padx=5)
+
         # If editing mode, populate fields with existing data
         if item_data:
              self.name_entry.insert(0, item_data.get('name', ''))
@@ -587,6 +837,20 @@ class AddEditDDLDialog(tk.Toplevel):
                  self.hour_spinbox.set("00")
                  self.minute_spinbox.set("00")
 
+             rule = item_data.get('repeat')
+             if isinstance(rule, dict) and rule.get('freq') in FREQUENCIES:
+                 self.repeat_combobox.set(FREQUENCY_NAMES[rule['freq']])
+                 self.interval_spinbox.set(str(rule.get('interval', 1)))
+                 if rule.get('count'):
+                     self.count_entry.insert(0, str(rule['count']))
+
+             reminders = item_data.get('reminders')
+             if isinstance(reminders, list):
+                 if reminders:
+                     self.reminder_entry.insert(0, format_reminder_minutes(reminders))
+                 else:
+                     self.no_reminder_var.set(True)
+
 
         # --- Buttons ---
         button_frame = ttk.Frame(self, padding="10")
@@ -654,8 +918,40 @@ class AddEditDDLDialog(tk.Toplevel):
         # Combine date and time string in the required format 'YYYY-MM-DD HH:MM'
         datetime_str_to_save = f"{date_str} {time_str}"
 
+        repeat_choice = self.repeat_choices.index(self.repeat_combobox.get())
+        rule = None
+        if repeat_choice > 0:
+            try:
+                rule = {"freq": FREQUENCIES[repeat_choice - 1], "interval": int(self.interval_spinbox.get())}
+                count_str = self.count_entry.get().strip()
+                if count_str:
+                    rule["count"] = int(count_str)
+                if rule["interval"] < 1 or rule.get("count", 1) < 1:
+                    raise ValueError("Interval or count out of range")
+            except ValueError:
+                messagebox.showwarning("输入错误", "重复间隔和次数必须是正整数。")
+                return
+            # Keep an end date set outside of this dialog (e.g. imported from a calendar)
+            old_rule = self.item_data.get('repeat') if self.item_data else None
+            if isinstance(old_rule, dict) and old_rule.get('until'):
+                rule["until"] = old_rule['until']
+
+        # Own reminders of this item; none given means the default ones from the settings
+        if self.no_reminder_var.get():
+            reminders = []
+        else:
+            try:
+                reminders = parse_reminder_minutes(self.reminder_entry.get()) or None
+            except ValueError:
+                messagebox.showwarning("输入错误", "提醒时间无效，请输入以逗号分隔的分钟数 (例如 1440, 60, 10)。")
+                return
+
         # Data is valid, store result and close
         self.result = {"name": name, "date": datetime_str_to_save}
+        if rule:
+            self.result["repeat"] = rule
+        if reminders is not None:
+            self.result["reminders"] = reminders
         self.grab_release() # Release modal grab
         self.destroy()
 
@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+
+# Wait this long after the last save request before writing (merges bursts of saves)
+DEBOUNCE_SECONDS = 0.3
+# But never postpone a write longer than this while requests keep coming in
+MAX_DELAY_SECONDS = 2.0
+
+
+class BackgroundWriter:
+    """
+    Runs save jobs on a worker thread, so slow disks don't block the Tk loop.
+
+    Jobs are submitted under a name (e.g. 'ddl_items'). Requests that arrive
+    within the debounce window are coalesced: only the latest job per name
+    runs, once. The outcome of every job is put into the thread-safe
+    'results' queue as (name, error), error being None on success, where
+    the Tk loop can pick it up.
+    """
+
+    def __init__(self, debounce_seconds=DEBOUNCE_SECONDS, max_delay_seconds=MAX_DELAY_SECONDS):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.results = queue.Queue()
+        self._requests = queue.Queue()
+        self._outstanding = 0 # Submitted jobs whose result was not put into 'results' yet
+        self._outstanding_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="BackgroundWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, name, job):
+        """Schedules job() to run on the worker thread (replacing a pending job with the same name)."""
+        with self._outstanding_lock:
+            self._outstanding += 1
+        self._requests.put((name, job))
+
+    def has_outstanding(self):
+        with self._outstanding_lock:
+            return self._outstanding > 0
+
+    def flush(self, timeout=None):
+        """Runs all pending jobs now and waits until they are done."""
+        if not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._requests.put((None, done.set))
+        done.wait(timeout)
+
+    def stop(self, timeout=None):
+        """Flushes the pending jobs and ends the worker thread."""
+        self.flush(timeout)
+        self._requests.put((None, None))
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            name, job = self._requests.get()
+            pending = {} # name -> latest job
+            control = None # flush() callback, or None
+            stopping = False
+            if name is None:
+                control = job
+                stopping = job is None
+            else:
+                pending[name] = job
+                # Debounce: keep collecting until no request came in for a while
+                deadline = time.monotonic() + self.max_delay_seconds
+                while True:
+                    timeout = min(self.debounce_seconds, deadline - time.monotonic())
+                    if timeout <= 0:
+                        break
+                    try:
+                        name, job = self._requests.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if name is None:
+                        control = job # flush / stop: write right away
+                        stopping = job is None
+                        break
+                    if name in pending:
+                        self._job_done() # Coalesced into the newer request
+                    pending[name] = job
+
+            for name, job in pending.items():
+                try:
+                    job()
+                    self.results.put((name, None))
+                except Exception as e:
+                    self.results.put((name, e))
+                self._job_done()
+
+            if control is not None:
+                control() # Wake up flush()
+            if stopping:
+                return
+
+    def _job_done(self):
+        with self._outstanding_lock:
+            self._outstanding -= 1
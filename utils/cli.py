@@ -0,0 +1,267 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+from datetime import datetime
+
+from utils.data_manager import DataManager, get_data_dir
+from utils.deadline_engine import DATE_FORMAT
+from utils.recurrence import FREQUENCIES, Recurrence, current_due
+
+# Subcommands; ddltool.py hands its arguments over to main() if the first one is one of these
+COMMANDS = ('list', 'add', 'rm', 'next', 'import', 'export')
+# How long a change waits for the running overlay to confirm its reload
+RELOAD_TIMEOUT_SECONDS = 0.5
+
+# This module (and everything it imports) must never import tkinter, ttkthemes
+# or tkcalendar: scripts and cron jobs call it, often without a display, and it
+# should finish in tens of milliseconds. Messages of DataManager go to stderr,
+# stdout only carries the JSON result.
+
+
+class CliError(Exception):
+    """A user error, reported as {"error": ...} on stderr with exit code 1."""
+
+
+def _open_data_manager():
+    # The items are loaded by the commands that need all of them: 'next' and 'list --upcoming/--overdue'
+    # are answered by an indexed query with the 'sqlite' backend, without parsing every item
+    data_manager = DataManager()
+    settings = data_manager.load_settings()
+    data_manager.set_storage_backend(settings.get('storage_backend', 'json'))
+    return data_manager, settings
+
+
+def _save(data_manager):
+    # Writes the changes now (on the writer thread, to get the error back) and raises if that failed
+    data_manager.request_save_ddl_items()
+    data_manager.flush()
+    for name, error in data_manager.get_save_results():
+        if error is not None:
+            raise CliError(f"保存失败: {error}")
+
+
+def _notify_running_instance():
+    # The running overlay would notice the file change within a few seconds anyway, this makes it immediate
+    from utils.single_instance import INSTANCE_FILE_NAME, COMMAND_RELOAD, send_command
+
+    data_dir = get_data_dir()
+    if os.path.exists(os.path.join(data_dir, INSTANCE_FILE_NAME)):
+        send_command(data_dir, COMMAND_RELOAD, timeout=RELOAD_TIMEOUT_SECONDS)
+
+
+def _describe(item, now, formatter):
+    # The item as stored plus its current due time (the current occurrence if it repeats) and countdown
+    described = item.to_dict()
+    try:
+        due = current_due(item, now)
+    except (TypeError, ValueError):
+        described.update(due=None, overdue=None, countdown=None)
+        return described
+    described.update(due=due.strftime(DATE_FORMAT), overdue=due < now, countdown=formatter.format_delta(due - now))
+    return described
+
+
+def _formatter(settings):
+    from utils.countdown_format import CountdownFormatter
+    return CountdownFormatter(settings.get('countdown_locale', 'zh'))
+
+
+def cmd_list(args, data_manager, settings):
+    now = datetime.now()
+    formatter = _formatter(settings)
+    if args.upcoming:
+        items = data_manager.get_upcoming_ddl_items(now, args.limit)
+    elif args.overdue:
+        items = data_manager.get_overdue_ddl_items(now)[:args.limit]
+    else:
+        # Overdue, then upcoming (both by due time), then the items without a valid date
+        data_manager.load_ddl_items()
+        items = data_manager.get_overdue_ddl_items(now) + data_manager.get_upcoming_ddl_items(now)
+        listed = {item.get('id') for item in items}
+        items += [item for item in data_manager.get_ddl_items() if item.get('id') not in listed]
+        items = items[:args.limit]
+    return [_describe(item, now, formatter) for item in items]
+
+
+def cmd_next(args, data_manager, settings):
+    now = datetime.now()
+    formatter = _formatter(settings)
+    return [_describe(item, now, formatter) for item in data_manager.get_upcoming_ddl_items(now, args.count)]
+
+
+def cmd_add(args, data_manager, settings):
+    from utils.importer import parse_csv_date
+
+    name = args.name.strip()
+    if not name:
+        raise CliError("项目名称不能为空")
+    try:
+        due = parse_csv_date(args.date) # Same formats as a CSV import, e.g. '2025-06-30 18:00' or '2025-06-30'
+    except ValueError as e:
+        raise CliError(str(e))
+    item = {'name': name, 'date': due.strftime(DATE_FORMAT)}
+
+    if args.repeat:
+        rule = {'freq': args.repeat, 'interval': args.interval}
+        if args.count is not None:
+            rule['count'] = args.count
+        if args.until:
+            try:
+                rule['until'] = parse_csv_date(args.until).strftime(DATE_FORMAT)
+            except ValueError as e:
+                raise CliError(str(e))
+        try:
+            Recurrence(due, rule)
+        except ValueError as e:
+            raise CliError(str(e))
+        item['repeat'] = rule
+
+    if args.no_reminders:
+        item['reminders'] = []
+    elif args.reminders is not None:
+        from utils.reminder_scheduler import parse_reminder_minutes
+        try:
+            item['reminders'] = parse_reminder_minutes(args.reminders)
+        except ValueError as e:
+            raise CliError(f"提醒时间无效: {e}")
+
+    data_manager.load_ddl_items() # A 'json' save writes all items
+    item = data_manager.add_ddl_item(item)
+    _save(data_manager)
+    _notify_running_instance()
+    return _describe(item, datetime.now(), _formatter(settings))
+
+
+def cmd_rm(args, data_manager, settings):
+    data_manager.load_ddl_items()
+    removed = []
+    missing = []
+    for item_id in args.ids:
+        try:
+            data_manager.delete_ddl_item(item_id)
+            removed.append(item_id)
+        except KeyError:
+            missing.append(item_id)
+    if removed:
+        _save(data_manager)
+        _notify_running_instance()
+    result = {'removed': removed, 'missing': missing}
+    if missing:
+        args.exit_code = 1
+    return result
+
+
+def cmd_import(args, data_manager, settings):
+    import csv
+    from utils.importer import import_file
+
+    data_manager.load_ddl_items() # Needed for the duplicate check
+    results = []
+    for file_path in args.files:
+        try:
+            result = import_file(data_manager, file_path, save=False)
+        except (OSError, ValueError, csv.Error) as e:
+            results.append({'file': file_path, 'error': str(e)})
+            args.exit_code = 1
+            continue
+        results.append({'file': file_path, 'imported': result.imported,
+                        'duplicates': result.duplicates, 'invalid': result.invalid})
+    if any(result.get('imported') for result in results):
+        _save(data_manager)
+        _notify_running_instance()
+    return results
+
+
+def cmd_export(args, data_manager, settings):
+    from utils.feed_server import render_ics, render_json
+
+    data_manager.load_ddl_items()
+    renderer = render_ics if args.format == 'ics' else render_json
+    body = renderer(data_manager.snapshot_ddl_items())
+    if args.output:
+        with open(args.output, 'wb') as f:
+            f.write(body)
+        return {'file': args.output, 'format': args.format, 'items': len(data_manager.get_ddl_items())}
+    args.raw_output = body # Written to stdout as is
+    return None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='ddltool', description="DDL 工具命令行 (不启动界面，输出 JSON)")
+    parser.add_argument('--pretty', action='store_true', help="缩进输出的 JSON")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = subparsers.add_parser('list', help="列出项目 (已过期、未到期、日期无效，按截止时间排序)")
+    group = list_parser.add_mutually_exclusive_group()
+    group.add_argument('--upcoming', action='store_true', help="只列出未到期的项目")
+    group.add_argument('--overdue', action='store_true', help="只列出已过期的项目")
+    list_parser.add_argument('--limit', type=int, help="最多列出的项目数")
+    list_parser.set_defaults(handler=cmd_list)
+
+    next_parser = subparsers.add_parser('next', help="接下来到期的项目")
+    next_parser.add_argument('-n', '--count', type=int, default=1, help="项目数 (默认 1)")
+    next_parser.set_defaults(handler=cmd_next)
+
+    add_parser = subparsers.add_parser('add', help="新增项目")
+    add_parser.add_argument('name', help="项目名称")
+    add_parser.add_argument('date', help="截止时间, 例如 '2025-06-30 18:00' (只有日期时为当天 23:59)")
+    add_parser.add_argument('--repeat', choices=FREQUENCIES, help="重复频率")
+    add_parser.add_argument('--interval', type=int, default=1, help="每隔几天/周/月重复 (默认 1)")
+    add_parser.add_argument('--count', type=int, help="重复次数 (含第一次)")
+    add_parser.add_argument('--until', help="最后一次不晚于此时间")
+    reminders = add_parser.add_mutually_exclusive_group()
+    reminders.add_argument('--reminders', help="提醒, 截止前分钟数, 逗号分隔 (默认使用设置中的提醒)")
+    reminders.add_argument('--no-reminders', action='store_true', help="不提醒")
+    add_parser.set_defaults(handler=cmd_add)
+
+    rm_parser = subparsers.add_parser('rm', help="按 id 删除项目")
+    rm_parser.add_argument('ids', nargs='+', metavar='ID')
+    rm_parser.set_defaults(handler=cmd_rm)
+
+    import_parser = subparsers.add_parser('import', help="从 .ics / .csv 文件导入项目")
+    import_parser.add_argument('files', nargs='+', metavar='FILE')
+    import_parser.set_defaults(handler=cmd_import)
+
+    export_parser = subparsers.add_parser('export', help="导出全部项目")
+    export_parser.add_argument('--format', choices=('json', 'ics'), default='json')
+    export_parser.add_argument('-o', '--output', help="输出文件 (默认输出到 stdout)")
+    export_parser.set_defaults(handler=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    """Command line: python -m utils.cli COMMAND ... (or ddltool.py COMMAND ...). Returns the exit code."""
+    args = build_parser().parse_args(argv)
+    args.exit_code = 0
+    args.raw_output = None
+    stdout = sys.stdout
+    if hasattr(stdout, 'reconfigure'):
+        stdout.reconfigure(encoding='utf-8') # Chinese names on consoles with a legacy code page
+
+    data_manager = None
+    try:
+        # Warnings printed by DataManager must not end up in the JSON on stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            data_manager, settings = _open_data_manager()
+            result = args.handler(args, data_manager, settings)
+    except CliError as e:
+        print(json.dumps({'error': str(e)}, ensure_ascii=False), file=sys.stderr)
+        return 1
+    finally:
+        if data_manager is not None:
+            with contextlib.redirect_stdout(sys.stderr):
+                data_manager.close()
+
+    if args.raw_output is not None:
+        stdout.flush()
+        stdout.buffer.write(args.raw_output)
+        stdout.buffer.flush()
+    else:
+        stdout.write(json.dumps(result, ensure_ascii=False, indent=2 if args.pretty else None) + '\n')
+    return args.exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
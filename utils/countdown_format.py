@@ -0,0 +1,188 @@
+import bisect
+import string
+from datetime import datetime
+
+from utils.deadline import epoch_minute
+
+# Countdown texts per locale (the 'countdown_locale' setting). Fields:
+# {days}, {hours}, {minutes}; rows: {name}, {date}, {countdown}, {reason}.
+TEMPLATES = {
+    'zh': {
+        'left_days': '剩余{days}天',
+        'left_days_hours': '剩余{days}天 {hours}小时',
+        'left_hours': '剩余{hours}小时',
+        'left_hours_minutes': '剩余{hours}小时 {minutes}分钟',
+        'left_minutes': '剩余{minutes}分钟',
+        'left_under_minute': '剩余不足1分钟',
+        'left_now': '剩余很快了！',
+        'overdue_days': '已过期 {days}天',
+        'overdue_days_hours': '已过期 {days}天 {hours}小时',
+        'overdue_hours': '已过期 {hours}小时',
+        'overdue_hours_minutes': '已过期 {hours}小时 {minutes}分钟',
+        'overdue_minutes': '已过期 {minutes}分钟',
+        'overdue_under_minute': '已过期不足1分钟',
+        'row': '- {name} ({date}) : {countdown}',
+        'invalid_row': '- {name}: {reason}',
+    },
+    'en': {
+        'left_days': '{days}d left',
+        'left_days_hours': '{days}d {hours}h left',
+        'left_hours': '{hours}h left',
+        'left_hours_minutes': '{hours}h {minutes}m left',
+        'left_minutes': '{minutes}m left',
+        'left_under_minute': '<1m left',
+        'left_now': 'due now!',
+        'overdue_days': 'overdue {days}d',
+        'overdue_days_hours': 'overdue {days}d {hours}h',
+        'overdue_hours': 'overdue {hours}h',
+        'overdue_hours_minutes': 'overdue {hours}h {minutes}m',
+        'overdue_minutes': 'overdue {minutes}m',
+        'overdue_under_minute': 'overdue <1m',
+        'row': '- {name} ({date}) : {countdown}',
+        'invalid_row': '- {name}: {reason}',
+    },
+}
+DEFAULT_LOCALE = 'zh'
+LOCALE_NAMES = {'zh': '中文', 'en': 'English'}
+# The countdown cache is cleared when it grows beyond this many strings
+MAX_CACHED_COUNTDOWNS = 50000
+ROW_FIELDS = ('name', 'date', 'countdown')
+
+
+def _compile_row_template(template):
+    # Splits a row template into its 4 literal parts and the order of its 3 fields,
+    # so rows are built with one f-string instead of a str.format() call with keywords
+    literals = ['']
+    order = []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        literals[-1] += literal
+        if field is not None:
+            order.append(ROW_FIELDS.index(field))
+            literals.append('')
+    if sorted(order) != [0, 1, 2]:
+        raise ValueError(f"row template needs each of {ROW_FIELDS} exactly once: {template!r}")
+    return tuple(literals), tuple(order)
+
+
+class CountdownFormatter:
+    """
+    Formats the countdowns of many deadlines at once.
+
+    A countdown only depends on a few integers (days + hours, or hours +
+    minutes), so each distinct text is built once from the precompiled
+    template and then looked up; a tick over the visible rows is mostly
+    dictionary hits. Due dates never change and are kept preformatted by
+    DeadlineEngine; format_rows() picks the short form (without the year)
+    for a whole run of rows with one bisect instead of a check per row.
+    """
+
+    def __init__(self, locale=DEFAULT_LOCALE):
+        self.locale = None
+        self.set_locale(locale)
+
+    def set_locale(self, locale):
+        """Switches the templates. Returns True if the locale changed. Unknown locales fall back to DEFAULT_LOCALE."""
+        if locale not in TEMPLATES:
+            print(f"Warning: unknown countdown locale '{locale}', using '{DEFAULT_LOCALE}'")
+            locale = DEFAULT_LOCALE
+        if locale == self.locale:
+            return False
+        self.locale = locale
+        # Bound str.format methods, the template strings are looked up only once
+        self._templates = {name: template.format for name, template in TEMPLATES[locale].items()}
+        self._row_literals, self._row_order = _compile_row_template(TEMPLATES[locale]['row'])
+        self._cache = {}
+        return True
+
+    def template(self, name):
+        """Returns the bound format method of a template, e.g. template('invalid_row')(name=..., reason=...)."""
+        return self._templates[name]
+
+    def format_delta(self, time_diff):
+        """
+        Formats the remaining (or overdue) time of a deadline.
+
+        Args:
+            time_diff (timedelta): due time minus now. Negative means overdue.
+
+        Returns:
+            str: e.g. "剩余3天 2小时" or "已过期 5分钟".
+        """
+        days = time_diff.days
+        if days >= 0:
+            hours, seconds = divmod(time_diff.seconds, 3600)
+            if days:
+                key = (days, hours)
+            elif hours or seconds >= 60:
+                key = (0, hours, seconds // 60)
+            else:
+                key = 'left_under_minute' if seconds else 'left_now'
+        else:
+            overdue = -time_diff
+            days = overdue.days
+            hours, seconds = divmod(overdue.seconds, 3600)
+            if days:
+                key = (-days, hours)
+            elif hours or seconds >= 60:
+                key = (-1, hours, seconds // 60) # Negative first field = overdue
+            else:
+                key = 'overdue_under_minute'
+
+        text = self._cache.get(key)
+        if text is None:
+            text = self._build(key)
+            if len(self._cache) >= MAX_CACHED_COUNTDOWNS:
+                self._cache.clear()
+            self._cache[key] = text
+        return text
+
+    def _build(self, key):
+        if isinstance(key, str):
+            return self._templates[key]()
+        prefix = 'left_' if key[0] >= 0 else 'overdue_'
+        if len(key) == 2:
+            days, hours = abs(key[0]), key[1]
+            if hours:
+                return self._templates[prefix + 'days_hours'](days=days, hours=hours)
+            return self._templates[prefix + 'days'](days=days)
+        _, hours, minutes = key
+        if hours and minutes:
+            return self._templates[prefix + 'hours_minutes'](hours=hours, minutes=minutes)
+        if hours:
+            return self._templates[prefix + 'hours'](hours=hours)
+        return self._templates[prefix + 'minutes'](minutes=minutes)
+
+    def format_batch(self, due_times, now):
+        """Returns the countdown texts of a sequence of due datetimes at 'now', in order."""
+        format_delta = self.format_delta
+        return [format_delta(due - now) for due in due_times]
+
+    def format_rows(self, entries, keys, start, now):
+        """
+        Formats DeadlineEngine entries (ddl_time, name, item, long_date, short_date, item_id)
+        into display rows. 'keys' are the engine's sorted (epoch minute, seq) keys and 'start'
+        the index of entries[0] in them; they locate the rows of the current year.
+        """
+        # Rows before / in / after the current year, the middle run shows the short date
+        year_start = min(max(bisect.bisect_left(keys, (epoch_minute(datetime(now.year, 1, 1)),)) - start, 0), len(entries))
+        year_stop = min(max(bisect.bisect_left(keys, (epoch_minute(datetime(now.year + 1, 1, 1)),)) - start, year_start), len(entries))
+        countdowns = self.format_batch([entry[0] for entry in entries], now)
+
+        l0, l1, l2, l3 = self._row_literals
+        i0, i1, i2 = self._row_order
+        rows = []
+        append = rows.append
+        for run_start, run_stop, date_index in ((0, year_start, 3), (year_start, year_stop, 4), (year_stop, len(entries), 3)):
+            for entry, countdown in zip(entries[run_start:run_stop], countdowns[run_start:run_stop]):
+                values = (entry[1], entry[date_index], countdown)
+                append(f"{l0}{values[i0]}{l1}{values[i1]}{l2}{values[i2]}{l3}")
+        return rows
+
+
+# Shared formatter for code that formats single countdowns
+_default_formatter = CountdownFormatter()
+
+
+def format_time_left(time_diff):
+    """Formats one countdown with the default (Chinese) templates, see CountdownFormatter.format_delta()."""
+    return _default_formatter.format_delta(time_diff)
@@ -1,11 +1,26 @@
 import json
 import os
 import sys
+import threading
+
+from utils.storage import JsonStore, JournalStore, SqliteStore, write_json_atomic
+from utils.deadline import Deadline
+from utils.recurrence import current_due
+from utils.background_writer import BackgroundWriter
+from utils.file_watcher import FileWatcher
 
 # Define data folder name
 DATA_FOLDER_NAME = 'data'
 DDL_FILE_NAME = 'ddl_items.json'
 SETTINGS_FILE_NAME = 'settings.json'
+DATA_DIR_ENV = 'DDLTOOL_DATA_DIR'
+
+# Storage backends for the DDL items, selected by the 'storage_backend' setting
+STORAGE_BACKENDS = {
+    'json': JsonStore,       # Rewrite ddl_items.json on every save (default)
+    'journal': JournalStore, # Append changes to ddl_items.journal, compact into ddl_items.json
+    'sqlite': SqliteStore,   # 'deadlines' table in ddl_items.db, migrated once from ddl_items.json
+}
 
 def get_app_base_path():
     """
@@ -28,11 +43,24 @@ def get_app_base_path():
         return project_root
 
 
+def get_data_dir():
+    """
+    Returns the folder of ddl_items.json and settings.json (<app base path>/data).
+    The DDLTOOL_DATA_DIR environment variable overrides it, e.g. for benchmarks.
+    """
+    return os.environ.get(DATA_DIR_ENV) or os.path.join(get_app_base_path(), DATA_FOLDER_NAME)
+
+
+def new_item_id():
+    """Returns a new unique id for a DDL item."""
+    import uuid # Imported on first use, listing items from the command line doesn't need it
+    return uuid.uuid4().hex
+
+
 class DataManager:
     def __init__(self):
-        # Get the base path for data files
-        app_base_path = get_app_base_path()
-        data_dir_path = os.path.join(app_base_path, DATA_FOLDER_NAME)
+        # Get the folder of the data files
+        data_dir_path = get_data_dir()
 
         # Ensure data directory exists
         os.makedirs(data_dir_path, exist_ok=True)
@@ -43,34 +71,366 @@ class DataManager:
         # print(f"Data file path: {self.ddl_file_path}") # Debug print
         # print(f"Settings file path: {self.settings_file_path}") # Debug print
 
+        # In-memory DDL items, indexed by their persistent 'id'.
+        # The dict keeps insertion order, which is also the order in the JSON file.
+        self._items_by_id = {}
+        self._listeners = []
+        # Changes since the last save: item id -> item (added / edited) or None (deleted)
+        self._pending_changes = {}
+        # Guards _items_by_id / _pending_changes against the background writer thread
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock() # Serializes writes to the store
+        self._writer = None # BackgroundWriter, created on the first request_save_*() call
+
+        self.storage_backend = 'json'
+        self._store = JsonStore(self.ddl_file_path)
+        self._loaded = False # True once load_ddl_items() has filled _items_by_id
+        self._watcher = None # FileWatcher on the storage files, created by load_ddl_items()
+
+
+    def set_storage_backend(self, backend_name):
+        """
+        Selects how DDL items are stored ('json', 'journal' or 'sqlite', see STORAGE_BACKENDS).
+        Call before load_ddl_items(). Unknown names fall back to 'json'.
+        """
+        if backend_name not in STORAGE_BACKENDS:
+            print(f"Warning: unknown storage backend '{backend_name}'. Using 'json'.")
+            backend_name = 'json'
+        self._store.close()
+        try:
+            self._store = STORAGE_BACKENDS[backend_name](self.ddl_file_path)
+        except Exception as e:
+            print(f"Error opening storage backend '{backend_name}': {e}. Using 'json'.")
+            backend_name = 'json'
+            self._store = JsonStore(self.ddl_file_path)
+        self.storage_backend = backend_name
+        self._loaded = False
+        self._watcher = None
+
+    def close(self):
+        """Writes all pending background saves and waits for storage work (e.g. journal compaction)."""
+        if self._writer is not None:
+            self._writer.stop()
+            self._writer = None
+        self._store.close()
+
+    def _get_writer(self):
+        if self._writer is None:
+            self._writer = BackgroundWriter()
+        return self._writer
+
+    def request_save_ddl_items(self):
+        """
+        Saves the DDL item changes on the background writer thread.
+        Bursts of requests are merged into one write, see get_save_results() for the outcome.
+        """
+        self._get_writer().submit('ddl_items', self._write_ddl_items)
+
+    def request_save_settings(self, settings):
+        """Saves a copy of the settings on the background writer thread."""
+        settings_snapshot = dict(settings)
+        self._get_writer().submit('settings', lambda: self._write_settings(settings_snapshot))
+
+    def has_pending_saves(self):
+        """True while background saves are running or their results weren't fetched yet."""
+        return self._writer is not None and (self._writer.has_outstanding() or not self._writer.results.empty())
+
+    def get_save_results(self):
+        """
+        Returns the finished background saves as a list of (name, error) tuples,
+        name being 'ddl_items' or 'settings' and error None on success.
+        Thread-safe, meant to be polled from the Tk loop.
+        """
+        results = []
+        if self._writer is not None:
+            while not self._writer.results.empty():
+                results.append(self._writer.results.get_nowait())
+        return results
+
+    def flush(self):
+        """Blocks until all requested background saves are written."""
+        if self._writer is not None:
+            self._writer.flush()
+
+
+    def add_listener(self, listener):
+        """
+        Registers a callback that is called as listener(action, item) after
+        every change of the DDL items: 'add', 'update' or 'delete' with the
+        affected Deadline, or 'reload' with the new list of all items.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, action, item):
+        for listener in list(self._listeners):
+            listener(action, item)
+
 
     def load_ddl_items(self):
-        if not os.path.exists(self.ddl_file_path):
-            return [] # File not found, return empty list
+        """
+        Loads the DDL items from file and (re)builds the id index.
+        Items without a (unique) 'id' get a new one, and the file is rewritten
+        once so that the ids stay the same across restarts.
+
+        Returns:
+            list: the items (Deadline objects), in file order.
+        """
+        with self._write_lock:
+            dicts_by_id, ids_assigned = self._index_items(self._store.load())
+        items_by_id = {item_id: Deadline.from_dict(data) for item_id, data in dicts_by_id.items()}
+        with self._lock:
+            self._items_by_id = items_by_id
+            self._pending_changes = {}
 
+        if ids_assigned:
+            self.save_ddl_items(self.get_ddl_items())
+        self._loaded = True
+        # Started after our own write above, so that doesn't count as an external change
+        self._watcher = FileWatcher(self._store.watched_paths())
+
+        items = self.get_ddl_items()
+        self._notify('reload', items)
+        return items
+
+    def _index_items(self, loaded_items):
+        # Returns (id -> item dict in file order, True if some items needed a new id).
+        # The callers convert the dicts to Deadline objects, and _write_ddl_items() converts them back
+        items_by_id = {}
+        ids_assigned = False
+        for item in loaded_items:
+            if not isinstance(item, dict):
+                print(f"Warning: skipping invalid DDL item {item!r} in {self.ddl_file_path}.")
+                continue
+            item_id = item.get('id')
+            if not isinstance(item_id, str) or not item_id or item_id in items_by_id:
+                item_id = new_item_id()
+                # Keep 'id' as the first key in the file
+                item = {'id': item_id, **{key: value for key, value in item.items() if key != 'id'}}
+                ids_assigned = True
+            items_by_id[item_id] = item
+        return items_by_id, ids_assigned
+
+    def reload_ddl_items_if_changed(self, force=False):
+        """
+        Reloads the DDL items if the storage files were changed by another program
+        (e.g. ddl_items.json regenerated by a script or synced from another machine).
+        The check itself is only a few os.stat() calls, so it can be polled.
+        With force=True the items are re-read without checking the files.
+
+        Only the differences are applied: the file's dicts are compared with the
+        current items first, and only new or changed ones are parsed into Deadline
+        objects. Unchanged items keep their object (so listeners like the
+        DeadlineEngine don't parse them again either), and one
+        'add' / 'update' / 'delete' notification is sent per changed item.
+        Unsaved local changes win over the file.
+
+        Returns:
+            bool: True if any item was added, changed or deleted.
+        """
+        if self._watcher is None:
+            return False
+        if not self._watcher.has_changed() and not force:
+            return False
         try:
-            with open(self.ddl_file_path, 'r', encoding='utf-8') as f:
-                items = json.load(f)
-                if not isinstance(items, list):
-                    print(f"Warning: {self.ddl_file_path} content is not a list. Returning empty list.")
-                    return []
-                # simple validation
-                # items = [item for item in items if isinstance(item, dict) and 'name' in item and 'date' in item]
-                return items
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading {self.ddl_file_path}: {e}")
-            return []
+            with self._write_lock:
+                new_dicts_by_id, ids_assigned = self._index_items(self._store.load())
         except Exception as e:
-            print(f"An unexpected error occurred while loading {self.ddl_file_path}: {e}")
-            return []
+            print(f"Error reloading {self.ddl_file_path}: {e}")
+            return False
+
+        events = []
+        with self._lock:
+            old_items_by_id = self._items_by_id
+            pending = self._pending_changes
+            items_by_id = {}
+            for item_id, data in new_dicts_by_id.items():
+                if item_id in pending:
+                    if pending[item_id] is not None:
+                        items_by_id[item_id] = pending[item_id] # Edited locally, not saved yet
+                    continue
+                old_item = old_items_by_id.get(item_id)
+                if old_item is None:
+                    item = Deadline.from_dict(data)
+                    items_by_id[item_id] = item
+                    events.append(('add', item))
+                elif old_item.to_dict() == data:
+                    items_by_id[item_id] = old_item
+                else:
+                    # Update in place, the item keeps its identity for the listeners
+                    old_item.assign(Deadline.from_dict(data))
+                    items_by_id[item_id] = old_item
+                    events.append(('update', old_item))
+            for item_id, item in pending.items():
+                if item is not None and item_id not in items_by_id:
+                    items_by_id[item_id] = item # Added locally, not saved yet
+            for item_id, old_item in old_items_by_id.items():
+                if item_id not in items_by_id:
+                    events.append(('delete', old_item))
+            self._items_by_id = items_by_id
+
+        if ids_assigned:
+            # Items written without an id keep the new ids from now on
+            self.save_ddl_items(self.get_ddl_items())
+        for action, item in events:
+            self._notify(action, item)
+        return bool(events)
+
+    def get_ddl_items(self):
+        """Returns a list of all items (Deadline objects, in file order)."""
+        with self._lock:
+            return list(self._items_by_id.values())
+
+    def snapshot_ddl_items(self):
+        """
+        Returns all items as JSON dicts (in file order). Safe to call from other
+        threads, e.g. to serialize the items while the Tk thread keeps editing them.
+        """
+        with self._lock:
+            return [item.to_dict() for item in self._items_by_id.values()]
+
+    def get_ddl_item(self, item_id):
+        """Returns the item (Deadline) with the given id, or None. Constant time."""
+        return self._items_by_id.get(item_id)
+
+    def get_upcoming_ddl_items(self, now, limit=None):
+        """
+        Returns the items due at or after 'now', earliest first (at most 'limit').
+        With the 'sqlite' backend and no unsaved changes, this runs as an indexed
+        SQL query and doesn't need load_ddl_items().
+        """
+        if self._can_query_store():
+            return self._stored_items(self._store.query_upcoming(now, limit))
+        upcoming = [(due, item) for due, item in self._parsed_items(now) if due >= now]
+        upcoming.sort(key=lambda parsed: parsed[0])
+        return [item for _, item in upcoming[:limit]]
+
+    def get_overdue_ddl_items(self, now):
+        """Returns the items due before 'now', earliest first (see get_upcoming_ddl_items)."""
+        if self._can_query_store():
+            return self._stored_items(self._store.query_overdue(now))
+        overdue = [(due, item) for due, item in self._parsed_items(now) if due < now]
+        overdue.sort(key=lambda parsed: parsed[0])
+        return [item for _, item in overdue]
 
-    def save_ddl_items(self, items):
+    def _can_query_store(self):
+        # The store only knows the saved state, and only once ddl_items.json was migrated into it
+        # (before the first load, or after switching back from another backend, the table is empty or stale)
+        return hasattr(self._store, 'query_upcoming') and not self._pending_changes and self._store.is_migrated()
+
+    def _stored_items(self, dicts):
+        # Query results of the store are JSON dicts: the loaded items if there are any, else new Deadlines
+        return [self._items_by_id.get(data.get('id')) or Deadline.from_dict(data) for data in dicts]
+
+    def _parsed_items(self, now):
+        # (due datetime, item) for the in-memory items with a valid date (the current occurrence if repeating)
+        if not self._loaded:
+            self.load_ddl_items()
+        for item in self._items_by_id.values():
+            try:
+                yield current_due(item, now), item
+            except (TypeError, ValueError):
+                continue
+
+    def add_ddl_item(self, item):
+        """
+        Adds a new item from a dict ({"name": ..., "date": ...}) and assigns its id.
+        Changes are kept in memory until save_ddl_items() is called.
+
+        Returns:
+            Deadline: the stored item, including its 'id'.
+        """
+        item = Deadline.from_dict(item)
+        item.id = new_item_id()
+        with self._lock:
+            self._items_by_id[item.id] = item
+            self._pending_changes[item.id] = item
+        self._notify('add', item)
+        return item
+
+    def add_ddl_items(self, items):
+        """
+        Adds several new items from dicts at once (e.g. a batch of an import), see add_ddl_item().
+
+        Returns:
+            list: the stored items (Deadline objects), including their ids.
+        """
+        stored_items = [Deadline.from_dict(item) for item in items]
+        for item in stored_items:
+            item.id = new_item_id()
+        with self._lock:
+            for item in stored_items:
+                self._items_by_id[item.id] = item
+                self._pending_changes[item.id] = item
+        for item in stored_items:
+            self._notify('add', item)
+        return stored_items
+
+    def update_ddl_item(self, item_id, changes):
+        """
+        Updates the fields of an existing item in place (the id can't be changed).
+        A field whose new value is None is removed (e.g. {'repeat': None}).
+        Raises KeyError if there is no item with this id.
+
+        Returns:
+            Deadline: the updated item.
+        """
+        with self._lock:
+            item = self._items_by_id[item_id]
+            item.apply_changes(changes)
+            self._pending_changes[item_id] = item
+        self._notify('update', item)
+        return item
+
+    def delete_ddl_item(self, item_id):
+        """
+        Deletes the item with the given id. Constant time.
+        Raises KeyError if there is no item with this id.
+
+        Returns:
+            Deadline: the deleted item.
+        """
+        with self._lock:
+            item = self._items_by_id.pop(item_id)
+            self._pending_changes[item_id] = None
+        self._notify('delete', item)
+        return item
+
+    def save_ddl_items(self, items=None):
+        """
+        Saves the changes made since the last save (only the changed items are
+        written by the 'journal' backend). If a list of items is given, it is
+        written as a full snapshot instead.
+        """
         try:
-            with open(self.ddl_file_path, 'w', encoding='utf-8') as f:
-                json.dump(items, f, indent=4, ensure_ascii=False) # ensure_ascii=False supports Chinese
+            self._write_ddl_items(items)
         except Exception as e:
             print(f"Error saving {self.ddl_file_path}: {e}")
 
+    def _write_ddl_items(self, items=None):
+        # Does the actual write for save_ddl_items(), may run on the background writer thread
+        with self._write_lock:
+            with self._lock:
+                changes = {item_id: (item.to_dict() if item is not None else None)
+                           for item_id, item in self._pending_changes.items()}
+                self._pending_changes = {}
+            try:
+                if items is not None:
+                    self._store.save_all([item.to_dict() if isinstance(item, Deadline) else item for item in items])
+                else:
+                    self._store.save_changes(self.snapshot_ddl_items, changes)
+                if self._watcher is not None:
+                    self._watcher.reset() # Our own write isn't an external change
+            except Exception:
+                # Keep the failed changes for the next save (unless the item changed again meanwhile)
+                with self._lock:
+                    for item_id in changes:
+                        self._pending_changes.setdefault(item_id, self._items_by_id.get(item_id))
+                raise
+
     def load_settings(self):
         # Add new default settings
         default_settings = {
@@ -85,7 +445,12 @@ class DataManager:
             'fg_color': 'white',   # Default foreground color (white)
             'bg_color': 'black',   # Default background color (black)
             'alpha': 1.0,          # Default transparency (opaque)
-            'theme': 'arc'         # Default theme (requires ttkthemes)
+            'theme': 'arc',        # Default theme (requires ttkthemes)
+            'storage_backend': 'json', # How DDL items are stored: 'json', 'journal' or 'sqlite'
+            'feed_port': 0,        # Localhost port of the ICS/JSON feed, 0 = feed disabled
+            'reminder_minutes': [1440, 60, 10], # Reminders before each deadline (minutes), see utils/reminder_scheduler.py
+            'reminder_toast': True, # Show a toast below the overlay on a reminder (the overlay always flashes)
+            'countdown_locale': 'zh' # Language of the countdowns: 'zh' or 'en' (see utils/countdown_format.py)
         }
 
         if not os.path.exists(self.settings_file_path):
@@ -112,7 +477,9 @@ class DataManager:
 
     def save_settings(self, settings):
         try:
-            with open(self.settings_file_path, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=4, ensure_ascii=False)
+            self._write_settings(settings)
         except Exception as e:
-            print(f"Error saving {self.settings_file_path}: {e}")
\ No newline at end of file
+            print(f"Error saving {self.settings_file_path}: {e}")
+
+    def _write_settings(self, settings):
+        write_json_atomic(self.settings_file_path, settings)
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+# Storage format of the 'date' field in ddl_items.json
+DATE_FORMAT = '%Y-%m-%d %H:%M'
+# Sort keys count whole minutes since this (naive, local) moment
+EPOCH = datetime(1970, 1, 1)
+_MINUTE = timedelta(minutes=1)
+
+
+def parse_due(date_str):
+    """
+    Parses a deadline date string ('YYYY-MM-DD HH:MM') into a datetime.
+    Raises ValueError if the string does not match the storage format.
+    """
+    # Fast path for the canonical format, strptime is an order of magnitude slower
+    if _is_canonical_date(date_str):
+        return datetime.fromisoformat(date_str)
+    return datetime.strptime(date_str, DATE_FORMAT)
+
+
+def _is_canonical_date(date_str):
+    # True if the string has exactly the zero-padded 'YYYY-MM-DD HH:MM' layout (TypeError if it isn't a string)
+    return (len(date_str) == 16 and date_str[4] == '-' and date_str[7] == '-'
+            and date_str[10] == ' ' and date_str[13] == ':')
+
+
+def epoch_minute(moment):
+    """Returns the integer sort key of a datetime: whole minutes since EPOCH (rounded down)."""
+    return (moment - EPOCH) // _MINUTE
+
+
+class Deadline:
+    """
+    One DDL item in memory.
+
+    A record with __slots__ instead of the JSON dict: the date is parsed once
+    when it is set, and the due time, its integer sort key (epoch minutes) and
+    the display string are kept with the item, so nothing on the GUI paths has
+    to parse it again. Fields that the app doesn't know are kept in 'extra'
+    and written back unchanged.
+
+    DataManager converts at its boundary (from_dict() when items are loaded or
+    added, to_dict() for the storage backends, the feed and other threads).
+    For the code that reads items, get(), [] and 'in' work like on the dict,
+    with None fields treated as missing.
+    """
+
+    __slots__ = ('id', 'name', 'date', 'repeat', 'reminders', 'extra', 'due', 'sort_key', 'display_date')
+    # Known fields, in the key order of the JSON file
+    FIELDS = ('id', 'name', 'date', 'repeat', 'reminders')
+    _FIELD_SET = frozenset(FIELDS)
+
+    def __init__(self, id=None, name=None, date=None, repeat=None, reminders=None, extra=None):
+        self.id = id
+        self.name = name
+        self.repeat = repeat       # Repeat rule, see utils/recurrence.py
+        self.reminders = reminders # Own reminders (minutes before due), see utils/reminder_scheduler.py
+        self.extra = extra         # Unknown fields of the JSON dict, or None
+        self.set_date(date)
+
+    def set_date(self, date):
+        """Sets the 'date' string and its parsed forms (due, sort_key, display_date are None if it is invalid)."""
+        self.date = date
+        try:
+            if _is_canonical_date(date):
+                due = datetime.fromisoformat(date)
+                display_date = date # Shares the string
+            else:
+                due = datetime.strptime(date, DATE_FORMAT)
+                display_date = due.strftime(DATE_FORMAT)
+        except (TypeError, ValueError):
+            self.due = self.sort_key = self.display_date = None
+            return
+        self.due = due
+        self.sort_key = epoch_minute(due)
+        self.display_date = display_date
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates a Deadline from an item dict of ddl_items.json."""
+        extra = None
+        if not cls._FIELD_SET.issuperset(data):
+            extra = {key: value for key, value in data.items() if key not in cls._FIELD_SET}
+        return cls(data.get('id'), data.get('name'), data.get('date'),
+                   data.get('repeat'), data.get('reminders'), extra)
+
+    def to_dict(self):
+        """Returns the item dict for ddl_items.json (None fields are left out)."""
+        data = {key: getattr(self, key) for key in self.FIELDS if getattr(self, key) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def apply_changes(self, changes):
+        """Updates fields from a dict of changes ('id' is ignored, None removes a field)."""
+        for key, value in changes.items():
+            if key == 'id':
+                continue
+            if key == 'date':
+                self.set_date(value)
+            elif key in self.FIELDS:
+                setattr(self, key, value)
+            elif value is None:
+                if self.extra:
+                    self.extra.pop(key, None)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+
+    def assign(self, other):
+        """Copies all fields of another Deadline (keeps this object's identity for the listeners)."""
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+
+    # --- Read access like on the item dict ---
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __repr__(self):
+        return f"Deadline({self.to_dict()!r})"
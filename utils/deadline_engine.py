@@ -0,0 +1,411 @@
+import bisect
+import heapq
+import itertools
+import math
+from datetime import datetime, timedelta
+
+from utils.deadline import DATE_FORMAT, Deadline, parse_due, _is_canonical_date, epoch_minute
+from utils.recurrence import item_recurrence
+from utils.countdown_format import CountdownFormatter, DEFAULT_LOCALE, format_time_left
+
+def next_label_change(ddl_time, now):
+    """
+    Returns the earliest time after which the countdown text of a deadline
+    (as produced by format_time_left) differs from the text at 'now'.
+
+    Countdowns more than a day away (or overdue) only show days and hours, so
+    they change on hour boundaries relative to the due time; closer ones
+    change every minute.
+    """
+    remaining = (ddl_time - now).total_seconds()
+    if remaining >= 0:
+        if remaining >= 24 * 3600:
+            step = 3600
+        elif remaining >= 60:
+            step = 60
+        elif remaining >= 1:
+            return ddl_time - timedelta(seconds=1) # "不足1分钟" -> "很快了！"
+        else:
+            return ddl_time # -> "已过期..."
+        return ddl_time - timedelta(seconds=(remaining // step) * step)
+
+    overdue = -remaining
+    step = 3600 if overdue >= 24 * 3600 else 60
+    return ddl_time + timedelta(seconds=(overdue // step + 1) * step)
+
+
+class DeadlineEngine:
+    """
+    Headless model of the deadline list shown by DisplayWindow.
+
+    Owns the parsed and sorted deadline set, so the GUI does not need to
+    re-parse and re-sort the items on every refresh tick. Does not depend on
+    tkinter and can be used (and benchmarked) without a display server.
+
+    The set is kept as a persistent index sorted by due time: load() builds
+    it once, add() / remove() / replace() update it with a bisect lookup
+    instead of a full re-parse and re-sort.
+
+    Repeating items (see utils/recurrence.py) are indexed by the occurrence
+    that is currently displayed. A min-heap of these due times lets rows() and
+    next_change() roll an item over to its next occurrence once the current
+    one has passed, so only one occurrence per item is ever materialized.
+
+    Items are identified by their persistent 'id' (assigned by DataManager),
+    items without one get an id for the lifetime of the engine. Connect
+    on_data_change() to DataManager.add_listener() to follow the edits made
+    through DataManager. Views that mirror the sorted set (like the Treeview
+    in SettingsWindow) can subscribe() to the changes and apply them row by
+    row, see _notify() for the callback arguments.
+    """
+
+    def __init__(self, ddl_items=None, locale=DEFAULT_LOCALE):
+        self._keys = [] # Sorted list of (epoch minute of ddl_time, seq), seq keeps keys unique and ties in insertion order
+        self._entries = [] # Parallel to _keys: (ddl_time, name, item, long_date_str, short_date_str, item_id)
+        self._items = {} # item_id -> item, for all items (valid or not)
+        self._item_ids = {} # id(item) -> item_id
+        self._sort_keys = {} # item_id -> key in _keys, for the valid items
+        self._invalid = {} # item_id -> (name, reason, item) for items that can't be displayed
+        self._minute_counts = [0] * 60 # Number of valid entries per due minute-of-hour (see next_change)
+        self._recurrences = {} # item_id -> Recurrence, for the repeating items
+        self._rollovers = [] # Heap of (displayed due time, item_id) of the repeating items, may hold stale entries
+        self._now = None # Latest 'now' passed to rows() / next_change(), used to pick the occurrence of new items
+        self._seq = 0
+        self.formatter = CountdownFormatter(locale) # Countdown texts of rows()
+        self._listeners = []
+        self._data_error = False # True if ddl_items is not a list
+        self.load(ddl_items if ddl_items is not None else [])
+
+    def subscribe(self, listener):
+        """Registers a callback for changes of the sorted set, see _notify()."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, action, item_id=None, index=None, old_index=None):
+        # Listener arguments:
+        #   'reset'                          whole set was rebuilt by load()
+        #   'insert', item_id, index         new item at position index
+        #   'delete', item_id, old_index     item removed from position old_index
+        #   'update', item_id, index         item changed but kept its position
+        #   'move',   item_id, index, old_index   item changed and moved from old_index to index
+        # Positions are the ones of sorted_items(), i.e. before the change for
+        # old_index and after the change for index.
+        for listener in list(self._listeners):
+            listener(action, item_id, index, old_index)
+
+    def load(self, ddl_items):
+        """
+        (Re)builds the parsed and sorted deadline set from the raw item dicts.
+        Only needed when the whole ddl_items list was replaced; single changes
+        should go through add() / remove() / replace().
+        """
+        self._keys = []
+        self._entries = []
+        self._items = {}
+        self._item_ids = {}
+        self._sort_keys = {}
+        self._invalid = {}
+        self._minute_counts = [0] * 60
+        self._recurrences = {}
+        self._rollovers = []
+        self._data_error = not isinstance(ddl_items, list)
+        if self._data_error:
+            self._notify('reset')
+            return
+
+        keyed_entries = []
+        for item in ddl_items:
+            item_id = self._register(item)
+            entry = self._parse_item(item, item_id)
+            if entry is not None:
+                key = self._new_key(entry)
+                self._sort_keys[item_id] = key
+                self._minute_counts[entry[0].minute] += 1
+                keyed_entries.append((key, entry))
+                if item_id in self._recurrences:
+                    self._rollovers.append((entry[0], item_id))
+
+        heapq.heapify(self._rollovers)
+        # Sort valid items by due date once, later changes keep the order
+        keyed_entries.sort(key=lambda keyed_entry: keyed_entry[0])
+        self._keys = [key for key, _ in keyed_entries]
+        self._entries = [entry for _, entry in keyed_entries]
+        self._notify('reset')
+
+    def add(self, item):
+        """Inserts a new item dict into the sorted set. Returns its item id."""
+        item_id = self._register(item)
+        self._notify('insert', item_id, self._insert(item, item_id))
+        return item_id
+
+    def remove(self, item):
+        """
+        Removes an item dict (the same object that was loaded or added) from the sorted set.
+        Raises KeyError if the item is not part of the set.
+        """
+        item_id = self._item_ids.pop(id(item))
+        del self._items[item_id]
+        self._notify('delete', item_id, old_index=self._discard(item_id))
+
+    def update(self, item):
+        """Re-positions an item dict that was edited in place (e.g. its date changed)."""
+        item_id = self._item_ids[id(item)]
+        old_index = self._discard(item_id)
+        index = self._insert(item, item_id)
+        if index == old_index:
+            self._notify('update', item_id, index)
+        else:
+            self._notify('move', item_id, index, old_index)
+
+    def on_data_change(self, action, item):
+        """
+        Listener for DataManager.add_listener(): applies an add / update / delete
+        of a single item, or a reload of all items (item is then the new item list).
+        """
+        if action == 'add':
+            self.add(item)
+        elif action == 'update':
+            self.update(item)
+        elif action == 'delete':
+            self.remove(item)
+        elif action == 'reload':
+            self.load(item)
+
+    def get_item(self, item_id):
+        """Returns the item dict for an item id, or None."""
+        return self._items.get(item_id)
+
+    def item_id(self, item):
+        """Returns the item id of an item dict, or None if it is not part of the set."""
+        return self._item_ids.get(id(item))
+
+    def _register(self, item):
+        item_id = item.get('id') if isinstance(item, (dict, Deadline)) else None
+        if not item_id:
+            item_id = str(self._next_seq())
+        self._item_ids[id(item)] = item_id
+        self._items[item_id] = item
+        return item_id
+
+    def _insert(self, item, item_id):
+        # Adds a registered item to the sorted (or invalid) entries, returns its position
+        entry = self._parse_item(item, item_id)
+        if entry is None:
+            return len(self._entries) + len(self._invalid) - 1 # Invalid items are appended at the end
+        key = self._new_key(entry)
+        index = bisect.bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._entries.insert(index, entry)
+        self._sort_keys[item_id] = key
+        self._minute_counts[entry[0].minute] += 1
+        if item_id in self._recurrences:
+            heapq.heappush(self._rollovers, (entry[0], item_id))
+        return index
+
+    def _discard(self, item_id):
+        # Removes an item from the sorted (or invalid) entries, returns its former position.
+        # Its rollover heap entry becomes stale and is skipped later.
+        self._recurrences.pop(item_id, None)
+        if item_id in self._invalid:
+            index = len(self._entries) + list(self._invalid).index(item_id)
+            del self._invalid[item_id]
+            return index
+        key = self._sort_keys.pop(item_id)
+        index = bisect.bisect_left(self._keys, key)
+        del self._keys[index]
+        del self._entries[index]
+        self._minute_counts[key[0] % 60] -= 1 # Epoch minutes start on a full hour
+        return index
+
+    def _new_key(self, entry):
+        # Sort key of a new entry; a Deadline brings the key of its date along
+        item = entry[2]
+        if isinstance(item, Deadline) and item.due is entry[0]:
+            return (item.sort_key, self._next_seq())
+        return (epoch_minute(entry[0]), self._next_seq())
+
+    def _next_seq(self):
+        self._seq += 1
+        return self._seq
+
+    def _parse_item(self, item, item_id):
+        # Returns the sorted-set entry for a valid item, or records why it can't be displayed and returns None
+        if isinstance(item, Deadline) and item.due is not None and not item.repeat:
+            # Parsed and formatted once, when its date was set
+            return self._entry(item.due, item.get('name', '未命名项目'), item, item.display_date, item_id)
+        if not isinstance(item, (dict, Deadline)):
+            self._invalid[item_id] = ('未命名项目', "处理日期出错 (项目格式不正确)", item)
+            return None
+
+        item_name = item.get('name', '未命名项目')
+        item_date_str = item.get('date')
+
+        if not item_date_str:
+            self._invalid[item_id] = (item_name, "未设置日期", item)
+            return None
+
+        try:
+            ddl_time = parse_due(item_date_str)
+        except ValueError:
+            self._invalid[item_id] = (item_name, f"无效日期格式 '{item_date_str}'", item)
+            return None
+        except Exception as e:
+            self._invalid[item_id] = (item_name, f"处理日期出错 ({e})", item)
+            return None
+
+        try:
+            recurrence = item_recurrence(item, ddl_time)
+        except ValueError as e:
+            self._invalid[item_id] = (item_name, f"无效重复规则 ({e})", item)
+            return None
+        if recurrence is not None:
+            self._recurrences[item_id] = recurrence
+            ddl_time = recurrence.current(self._now or datetime.now())
+            return self._entry(ddl_time, item_name, item, ddl_time.strftime(DATE_FORMAT), item_id)
+
+        # The due date strings never change, so format them only once
+        if _is_canonical_date(item_date_str):
+            long_date_str = item_date_str
+        else:
+            long_date_str = ddl_time.strftime('%Y-%m-%d %H:%M')
+        return self._entry(ddl_time, item_name, item, long_date_str, item_id)
+
+    def _entry(self, ddl_time, item_name, item, long_date_str, item_id):
+        return (ddl_time, item_name, item, long_date_str, long_date_str[5:], item_id)
+
+    def _roll_over(self, now):
+        # Moves repeating items whose displayed occurrence has passed to their next occurrence
+        self._now = now
+        while self._rollovers and self._rollovers[0][0] < now:
+            due, item_id = heapq.heappop(self._rollovers)
+            recurrence = self._recurrences.get(item_id)
+            key = self._sort_keys.get(item_id)
+            if recurrence is None or key is None or key[0] != epoch_minute(due):
+                continue # Stale: the item was removed or re-indexed since
+            next_due = recurrence.occurrence_at_or_after(now)
+            if next_due is None:
+                continue # Series ended, the last occurrence stays (overdue)
+
+            index = bisect.bisect_left(self._keys, key)
+            entry = self._entries[index]
+            del self._keys[index]
+            del self._entries[index]
+            self._minute_counts[due.minute] -= 1
+
+            new_key = (epoch_minute(next_due), self._next_seq())
+            new_index = bisect.bisect_right(self._keys, new_key)
+            self._keys.insert(new_index, new_key)
+            self._entries.insert(new_index, self._entry(next_due, entry[1], entry[2], next_due.strftime(DATE_FORMAT), item_id))
+            self._sort_keys[item_id] = new_key
+            self._minute_counts[next_due.minute] += 1
+            heapq.heappush(self._rollovers, (next_due, item_id))
+            if new_index == index:
+                self._notify('update', item_id, new_index)
+            else:
+                self._notify('move', item_id, new_index, index)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def sorted_items(self):
+        """
+        Returns the item dicts ordered by due date. Items whose date can't be
+        parsed are appended at the end.
+        """
+        items = [entry[2] for entry in self._entries]
+        items.extend(item for _, _, item in self._invalid.values())
+        return items
+
+    def sorted_item_ids(self):
+        """Returns the item ids in the same order as sorted_items()."""
+        item_ids = [entry[5] for entry in self._entries]
+        item_ids.extend(self._invalid)
+        return item_ids
+
+    def next_change(self, now):
+        """
+        Returns the earliest time after 'now' at which any row returned by
+        rows() would change, or None if the rows never change.
+        """
+        if self._data_error or not self._entries:
+            return None
+        self._roll_over(now)
+
+        # The due date drops its year at the turn of the year
+        next_change = datetime(now.year + 1, 1, 1)
+        # A repeating item jumps to its next occurrence when the current one is due
+        if self._rollovers and self._rollovers[0][0] < next_change:
+            next_change = self._rollovers[0][0]
+
+        # Deadlines more than a day away (or overdue) change on the hour,
+        # at the minute-of-hour of their due time
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+        for minute, count in enumerate(self._minute_counts):
+            if count:
+                change_time = hour_start + timedelta(minutes=minute)
+                if change_time < now:
+                    change_time += timedelta(hours=1)
+                if change_time < next_change:
+                    next_change = change_time
+
+        # Only the deadlines within a day of 'now' need to be checked one by one
+        one_day = timedelta(days=1)
+        start = bisect.bisect_left(self._keys, (epoch_minute(now - one_day),))
+        stop = bisect.bisect_right(self._keys, (epoch_minute(now + one_day), math.inf))
+        for ddl_time, _, _, _, _, _ in self._entries[start:stop]:
+            change_time = next_label_change(ddl_time, now)
+            if change_time < next_change:
+                next_change = change_time
+        return next_change
+
+    def set_locale(self, locale):
+        """Switches the language of the countdowns. Returns True if it changed (the rows need a redraw)."""
+        return self.formatter.set_locale(locale)
+
+    def row_count(self):
+        """Returns the number of rows that rows() produces."""
+        if self._data_error:
+            return 1
+        count = len(self._entries) + len(self._invalid)
+        if self._entries and self._invalid:
+            count += 2 # Separator between valid and invalid items
+        return count
+
+    def rows(self, now, start=0, stop=None):
+        """
+        Returns the render-ready text rows of the deadline list for the given time.
+        Only the rows in [start, stop) are formatted, so a view that shows a
+        window of the list doesn't pay for the rows it doesn't display.
+
+        Args:
+            now (datetime): the reference time for the countdowns.
+            start (int): index of the first row to return.
+            stop (int): index after the last row to return, None for all rows.
+
+        Returns:
+            list[str]: one string per display line.
+        """
+        if self._data_error:
+            return ["错误：截止日期数据格式不正确。"][start:stop]
+        self._roll_over(now)
+
+        row_count = self.row_count()
+        stop = row_count if stop is None else min(stop, row_count)
+        valid_count = len(self._entries)
+
+        rows = []
+        if start < valid_count:
+            rows = self.formatter.format_rows(self._entries[start:min(stop, valid_count)], self._keys, start, now)
+
+        # Add invalid items information
+        if self._invalid and stop > valid_count:
+            separator = ["", "---"] if valid_count else [] # Add separator if there are valid items
+            invalid_row = self.formatter.template('invalid_row')
+            invalid_rows = (invalid_row(name=item_name, reason=reason) for item_name, reason, _ in self._invalid.values())
+            rows.extend(itertools.islice(itertools.chain(separator, invalid_rows),
+                                         max(start - valid_count, 0), stop - valid_count))
+
+        return rows
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.deadline_engine import parse_due
+from utils.recurrence import item_recurrence
+
+FEED_HOST = '127.0.0.1' # Only reachable from this machine
+ICS_PATH = '/deadlines.ics'
+JSON_PATH = '/deadlines.json'
+# Longest line of an iCalendar file in octets, without the line break (RFC 5545)
+ICS_LINE_OCTETS = 75
+
+
+def _escape_ics_text(text):
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold_ics_line(line):
+    # Splits a content line into chunks of at most ICS_LINE_OCTETS octets,
+    # continuation lines start with a space. Never splits a UTF-8 character.
+    encoded = line.encode('utf-8')
+    if len(encoded) <= ICS_LINE_OCTETS:
+        return line
+    chunks = []
+    limit = ICS_LINE_OCTETS
+    current = ''
+    current_octets = 0
+    for char in line:
+        char_octets = len(char.encode('utf-8'))
+        if current_octets + char_octets > limit:
+            chunks.append(current)
+            current = ''
+            current_octets = 0
+            limit = ICS_LINE_OCTETS - 1 # The leading space counts too
+        current += char
+        current_octets += char_octets
+    chunks.append(current)
+    return '\r\n '.join(chunks)
+
+
+def _ics_rrule(recurrence):
+    # RRULE content line of a Recurrence, or None if the item doesn't repeat
+    if recurrence is None:
+        return None
+    parts = [f"FREQ={recurrence.freq.upper()}"]
+    if recurrence.interval != 1:
+        parts.append(f"INTERVAL={recurrence.interval}")
+    if recurrence.count is not None:
+        parts.append(f"COUNT={recurrence.count}")
+    if recurrence.until is not None:
+        parts.append(f"UNTIL={recurrence.until.strftime('%Y%m%dT%H%M%S')}")
+    return 'RRULE:' + ';'.join(parts)
+
+
+def render_ics(items, now=None):
+    """Renders the items with a valid date as VEVENTs of an iCalendar document (bytes)."""
+    stamp = (now or datetime.now(timezone.utc)).strftime('%Y%m%dT%H%M%SZ')
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//DDLTool//Deadline Feed//ZH',
+             'CALSCALE:GREGORIAN', 'X-WR-CALNAME:DDL 工具']
+    for item in items:
+        try:
+            due = parse_due(item.get('date'))
+        except (TypeError, ValueError):
+            continue # Can't be placed on a calendar
+        try:
+            rrule = _ics_rrule(item_recurrence(item, due))
+        except ValueError:
+            rrule = None # Invalid rule: publish the first occurrence only
+        due_str = due.strftime('%Y%m%dT%H%M%S') # Floating local time, like the stored value
+        lines += ['BEGIN:VEVENT',
+                  f"UID:{item.get('id')}@ddltool",
+                  f"DTSTAMP:{stamp}",
+                  f"DTSTART:{due_str}",
+                  f"DTEND:{due_str}"]
+        if rrule:
+            lines.append(rrule) # The calendar client expands the occurrences
+        lines += [f"SUMMARY:{_escape_ics_text(item.get('name', '未命名'))}",
+                  'END:VEVENT']
+    lines.append('END:VCALENDAR')
+    return ('\r\n'.join(_fold_ics_line(line) for line in lines) + '\r\n').encode('utf-8')
+
+
+def render_json(items):
+    """Renders the items as a JSON list (bytes), in file order."""
+    return json.dumps(items, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+# path -> (renderer, Content-Type)
+FEEDS = {
+    ICS_PATH: (render_ics, 'text/calendar; charset=utf-8'),
+    JSON_PATH: (render_json, 'application/json; charset=utf-8'),
+}
+
+
+class FeedCache:
+    """
+    Rendered feeds, rebuilt at most once per data change.
+
+    The DataManager listener only bumps a version number (cheap, runs on the Tk
+    thread for every change). The first request after a change renders the feed
+    from a snapshot of the items and stores it with its ETag; every other
+    request is answered from the cache.
+    """
+
+    def __init__(self, data_manager):
+        self.data_manager = data_manager
+        self._lock = threading.Lock()
+        self._version = 0
+        self._cache = {} # path -> (version, body, etag)
+
+    def on_data_change(self, action, item):
+        with self._lock:
+            self._version += 1
+
+    def get(self, path):
+        """Returns (body, etag) of the feed at path, rendering it if the items changed."""
+        with self._lock:
+            version = self._version
+            cached = self._cache.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        renderer, _ = FEEDS[path]
+        body = renderer(self.data_manager.snapshot_ddl_items())
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        with self._lock:
+            self._cache[path] = (version, body, etag)
+        return body, etag
+
+
+class _FeedRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'DDLTool'
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def _handle(self, send_body):
+        path = self.path.split('?', 1)[0]
+        if path not in FEEDS:
+            self.send_error(404)
+            return
+        body, etag = self.server.feed_cache.get(path)
+        if_none_match = self.headers.get('If-None-Match', '')
+        if etag in (tag.strip() for tag in if_none_match.split(',')) or if_none_match.strip() == '*':
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', FEEDS[path][1])
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache') # Clients revalidate with If-None-Match
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Subscribed clients poll often, don't flood the console
+
+
+class FeedServer:
+    """
+    Serves the DDL items as http://127.0.0.1:<port>/deadlines.ics and /deadlines.json
+    on a background thread, for calendar clients and other tools to subscribe to.
+    """
+
+    def __init__(self, data_manager, port, host=FEED_HOST):
+        self.data_manager = data_manager
+        self.feed_cache = FeedCache(data_manager)
+        self._httpd = ThreadingHTTPServer((host, port), _FeedRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.feed_cache = self.feed_cache
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    def start(self):
+        self.data_manager.add_listener(self.feed_cache.on_data_change)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="FeedServer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.data_manager.remove_listener(self.feed_cache.on_data_change)
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+
+def start_feed_server(data_manager, port):
+    """
+    Starts the feed server if port is set (the 'feed_port' setting, 0 = disabled).
+    Returns the FeedServer, or None if it is disabled or the port can't be opened.
+    """
+    if not port:
+        return None
+    try:
+        feed_server = FeedServer(data_manager, int(port))
+    except (OSError, ValueError) as e:
+        print(f"Warning: can't start the deadline feed on port {port}: {e}")
+        return None
+    feed_server.start()
+    print(f"Deadline feed: http://{FEED_HOST}:{feed_server.port}{ICS_PATH}")
+    return feed_server
@@ -0,0 +1,37 @@
+import os
+
+
+class FileWatcher:
+    """
+    Detects changes of a few files by comparing os.stat() mtime and size.
+
+    A check is a handful of stat() calls and no reads, so it is cheap enough
+    to poll every few seconds from the Tk loop. Missing files are part of the
+    signature too, so creating or deleting a watched file counts as a change.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._signature = self._read_signature()
+
+    def _read_signature(self):
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None) # Missing (or unreadable) file
+        return tuple(signature)
+
+    def has_changed(self):
+        """True if any file changed since the last call (or since reset())."""
+        signature = self._read_signature()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return True
+
+    def reset(self):
+        """Accepts the current state of the files, e.g. after writing them ourselves."""
+        self._signature = self._read_signature()
@@ -0,0 +1,294 @@
+import csv
+import hashlib
+import os
+import sys
+from datetime import datetime, timezone
+
+from utils.deadline_engine import DATE_FORMAT
+from utils.recurrence import FREQUENCIES
+
+# Items handed to DataManager.add_ddl_items() at once
+IMPORT_BATCH_SIZE = 500
+
+# Column names recognized in CSV files (compared lower-case)
+CSV_NAME_COLUMNS = ('name', 'title', 'summary', 'subject', '名称', '项目名称', '标题')
+CSV_DATE_COLUMNS = ('date', 'due', 'deadline', 'dtstart', 'start', 'end', '日期', '截止日期', '截止时间')
+# Date formats accepted in CSV files, tried in this order
+CSV_DATE_FORMATS = (DATE_FORMAT, '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S',
+                    '%Y/%m/%d %H:%M', '%Y/%m/%d %H:%M:%S', '%Y-%m-%d', '%Y/%m/%d')
+# Time used for entries that only have a date (all-day events): due at the end of that day
+ALL_DAY_TIME = (23, 59)
+
+
+class ImportResult:
+    """Counts of an import_file() run."""
+
+    def __init__(self):
+        self.imported = 0   # New items added
+        self.duplicates = 0 # Skipped, an item with the same name and date already exists
+        self.invalid = 0    # Skipped, no name or no readable date
+
+    def __repr__(self):
+        return f"ImportResult(imported={self.imported}, duplicates={self.duplicates}, invalid={self.invalid})"
+
+
+def content_hash(name, date_str):
+    """Identifies an item by its content (name and date), used to skip duplicates."""
+    return hashlib.sha1(f"{name}\0{date_str}".encode('utf-8')).hexdigest()
+
+
+# --- Parsing: file lines -> raw records ---
+
+def _unfold_ics_lines(lines):
+    # RFC 5545: long lines are folded, a line starting with a space or tab continues the previous one
+    current = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t'):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _unescape_ics_text(value):
+    return (value.replace('\\n', ' ').replace('\\N', ' ').replace('\\,', ',')
+            .replace('\\;', ';').replace('\\\\', '\\').strip())
+
+
+def iter_ics_records(lines):
+    """
+    Yields one dict per VEVENT / VTODO of an iCalendar file: {'name': SUMMARY,
+    'date': DUE or DTSTART value, 'date_params': parameters of that property,
+    'rrule': RRULE value or None}.
+    Reads the lines one at a time, so the file is never held in memory.
+    """
+    record = None
+    for line in _unfold_ics_lines(lines):
+        upper_line = line.upper()
+        if upper_line in ('BEGIN:VEVENT', 'BEGIN:VTODO'):
+            record = {}
+            continue
+        if upper_line in ('END:VEVENT', 'END:VTODO'):
+            if record is not None:
+                # A task is due at DUE, an event at its start
+                date_value, date_params = record.get('DUE') or record.get('DTSTART') or (None, '')
+                yield {'name': record.get('SUMMARY'), 'date': date_value, 'date_params': date_params,
+                       'rrule': record.get('RRULE')}
+            record = None
+            continue
+        if record is None or ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        prop_name, _, params = key.partition(';')
+        prop_name = prop_name.upper()
+        if prop_name == 'SUMMARY':
+            record['SUMMARY'] = _unescape_ics_text(value)
+        elif prop_name in ('DUE', 'DTSTART'):
+            record[prop_name] = (value.strip(), params.upper())
+        elif prop_name == 'RRULE':
+            record['RRULE'] = value.strip()
+
+
+def iter_csv_records(lines):
+    """
+    Yields {'name': ..., 'date': ...} for every row of a CSV file with a header row.
+    The name / date columns are found by their header (see CSV_NAME_COLUMNS / CSV_DATE_COLUMNS).
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [column.strip().lower() for column in header]
+    name_index = next((columns.index(c) for c in CSV_NAME_COLUMNS if c in columns), None)
+    date_index = next((columns.index(c) for c in CSV_DATE_COLUMNS if c in columns), None)
+    if name_index is None or date_index is None:
+        raise ValueError(f"CSV 文件缺少名称或日期列 (表头: {', '.join(header)})")
+    for row in reader:
+        if not row:
+            continue
+        yield {'name': row[name_index] if name_index < len(row) else None,
+               'date': row[date_index] if date_index < len(row) else None}
+
+
+# --- Normalizing: raw records -> {"name": ..., "date": "YYYY-MM-DD HH:MM"} ---
+
+def parse_ics_date(value, params=''):
+    """
+    Converts an iCalendar DATE / DATE-TIME value to a local datetime.
+    UTC values (ending in 'Z') are converted to local time, values with a TZID
+    or without a zone are taken as local time. Date-only values are due at the end of the day.
+    """
+    if 'VALUE=DATE' in params.upper().split(';') or len(value) == 8:
+        day = datetime.strptime(value[:8], '%Y%m%d')
+        return day.replace(hour=ALL_DAY_TIME[0], minute=ALL_DAY_TIME[1])
+    if value.endswith('Z'):
+        utc_time = datetime.strptime(value[:15], '%Y%m%dT%H%M%S').replace(tzinfo=timezone.utc)
+        return utc_time.astimezone().replace(tzinfo=None)
+    return datetime.strptime(value[:15], '%Y%m%dT%H%M%S')
+
+
+def parse_ics_rrule(value):
+    """
+    Converts a simple iCalendar RRULE (FREQ=DAILY/WEEKLY/MONTHLY with optional
+    INTERVAL, COUNT, UNTIL) to a 'repeat' rule, see utils/recurrence.py.
+    Raises ValueError for rules that can't be represented (e.g. BYDAY lists).
+    """
+    parts = dict(part.split('=', 1) for part in value.upper().split(';') if '=' in part)
+    freq = parts.pop('FREQ', '').lower()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"不支持的重复频率: {freq or value}")
+    parts.pop('WKST', None) # Irrelevant without BYDAY
+    rule = {'freq': freq, 'interval': int(parts.pop('INTERVAL', 1))}
+    if 'COUNT' in parts:
+        rule['count'] = int(parts.pop('COUNT'))
+    if 'UNTIL' in parts:
+        rule['until'] = parse_ics_date(parts.pop('UNTIL')).strftime(DATE_FORMAT)
+    if parts:
+        raise ValueError(f"不支持的重复规则: {value}")
+    return rule
+
+
+def parse_csv_date(value):
+    """Converts a date string from a CSV file to a datetime (see CSV_DATE_FORMATS)."""
+    value = value.strip()
+    for date_format in CSV_DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+        if '%H' not in date_format:
+            parsed = parsed.replace(hour=ALL_DAY_TIME[0], minute=ALL_DAY_TIME[1])
+        return parsed
+    raise ValueError(f"无法识别的日期格式: {value}")
+
+
+def normalize_records(records, parse_date, result):
+    """
+    Turns raw records into DDL item dicts. Records without a name or with an
+    unreadable date are counted in result.invalid and skipped.
+    """
+    for record in records:
+        name = (record.get('name') or '').strip()
+        date_value = record.get('date')
+        if not name or not date_value:
+            result.invalid += 1
+            continue
+        try:
+            if 'date_params' in record:
+                due = parse_date(date_value, record['date_params'])
+            else:
+                due = parse_date(date_value)
+        except (ValueError, OverflowError) as e:
+            print(f"Warning: skipping '{name}', invalid date {date_value!r}: {e}")
+            result.invalid += 1
+            continue
+        item = {'name': name, 'date': due.strftime(DATE_FORMAT)}
+        if record.get('rrule'):
+            try:
+                item['repeat'] = parse_ics_rrule(record['rrule'])
+            except ValueError as e:
+                print(f"Warning: '{name}' is imported without repetition: {e}")
+        yield item
+
+
+def dedupe_items(items, known_hashes, result):
+    """Skips items whose content hash is in known_hashes (existing items or earlier rows of the file)."""
+    for item in items:
+        item_hash = content_hash(item['name'], item['date'])
+        if item_hash in known_hashes:
+            result.duplicates += 1
+            continue
+        known_hashes.add(item_hash)
+        yield item
+
+
+def batched(items, batch_size):
+    """Groups an iterable into lists of at most batch_size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- Pipeline ---
+
+def import_file(data_manager, file_path, save=True, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Imports the deadlines of an .ics or .csv file into the data manager.
+
+    The file is streamed through parse -> normalize -> dedupe -> batch insert,
+    so only one batch of items is held at a time (plus the content hashes).
+    Items that already exist with the same name and date are skipped.
+
+    Args:
+        data_manager (DataManager): receives the items (load_ddl_items() must have run).
+        file_path (str): path of the .ics / .csv file (detected by extension).
+        save (bool): save once at the end. The settings window passes False and
+            saves with its own (background) save instead.
+        batch_size (int): items per DataManager.add_ddl_items() call.
+
+    Returns:
+        ImportResult: the counts of imported / duplicate / invalid entries.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in ('.ics', '.ical', '.ifb'):
+        parse_records, parse_date = iter_ics_records, parse_ics_date
+    elif extension == '.csv':
+        parse_records, parse_date = iter_csv_records, parse_csv_date
+    else:
+        raise ValueError(f"不支持的文件类型: {extension or file_path}")
+
+    result = ImportResult()
+    known_hashes = {content_hash(item.get('name', ''), item.get('date', ''))
+                    for item in data_manager.get_ddl_items()}
+    # utf-8-sig strips the byte order mark that Excel puts into CSV exports
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        items = dedupe_items(normalize_records(parse_records(f), parse_date, result), known_hashes, result)
+        for batch in batched(items, batch_size):
+            data_manager.add_ddl_items(batch)
+            result.imported += len(batch)
+
+    if save and result.imported:
+        data_manager.save_ddl_items()
+    return result
+
+
+def main(argv=None):
+    """Command line: python -m utils.importer FILE [FILE ...]"""
+    from utils.data_manager import DataManager
+
+    file_paths = sys.argv[1:] if argv is None else argv
+    if not file_paths:
+        print("用法: python -m utils.importer 文件.ics|文件.csv [...]")
+        return 2
+
+    data_manager = DataManager()
+    settings = data_manager.load_settings()
+    data_manager.set_storage_backend(settings.get('storage_backend', 'json'))
+    data_manager.load_ddl_items()
+    exit_code = 0
+    try:
+        for file_path in file_paths:
+            try:
+                result = import_file(data_manager, file_path)
+            except (OSError, ValueError, csv.Error) as e:
+                print(f"导入 {file_path} 失败: {e}")
+                exit_code = 1
+                continue
+            print(f"{file_path}: 导入 {result.imported} 项, 跳过重复 {result.duplicates} 项, 无效 {result.invalid} 项")
+    finally:
+        data_manager.close()
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import calendar
+from datetime import timedelta
+
+from utils.deadline import Deadline, parse_due
+
+# An item repeats if it has a 'repeat' rule next to its first 'date':
+#   {"name": "实验报告", "date": "2025-03-03 18:00",
+#    "repeat": {"freq": "weekly", "interval": 1, "count": 16}}
+# freq:     'daily', 'weekly' or 'monthly'
+# interval: every n days / weeks / months (default 1)
+# until:    optional, 'YYYY-MM-DD HH:MM', no occurrence after this time
+# count:    optional, number of occurrences including the first one
+# Only the rule is stored, occurrences are computed when needed.
+FREQUENCIES = ('daily', 'weekly', 'monthly')
+FREQUENCY_NAMES = {'daily': '每天', 'weekly': '每周', 'monthly': '每月'}
+
+
+def _add_months(moment, months):
+    # Same day of month (clamped to the month's last day, e.g. Jan 31 -> Feb 28) and time, 'months' later
+    month_index = moment.month - 1 + months
+    year = moment.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+
+class Recurrence:
+    """
+    A repeating deadline: the first due time plus a rule.
+
+    Occurrences are never stored. occurrence_at_or_after() jumps straight to
+    the occurrence it needs with date arithmetic (constant time however long
+    the series has been running), and occurrences() is a lazy generator.
+    """
+
+    def __init__(self, start, rule):
+        """
+        Args:
+            start (datetime): the first occurrence (the item's 'date').
+            rule (dict): the item's 'repeat' value, see the module comment.
+
+        Raises:
+            ValueError: if the rule is invalid.
+        """
+        if not isinstance(rule, dict):
+            raise ValueError("重复规则格式不正确")
+        self.freq = rule.get('freq')
+        if self.freq not in FREQUENCIES:
+            raise ValueError(f"未知的重复频率 '{self.freq}'")
+        self.interval = rule.get('interval', 1)
+        if not isinstance(self.interval, int) or self.interval < 1:
+            raise ValueError(f"重复间隔必须是正整数 ('{self.interval}')")
+        self.count = rule.get('count')
+        if self.count is not None and (not isinstance(self.count, int) or self.count < 1):
+            raise ValueError(f"重复次数必须是正整数 ('{self.count}')")
+        until = rule.get('until')
+        if until is not None and not isinstance(until, str):
+            raise ValueError(f"重复截止时间格式不正确 ('{until}')")
+        self.until = parse_due(until) if until else None
+        self.start = start
+
+    def _nth(self, index):
+        # The index-th occurrence (0 = start), ignoring count / until
+        if self.freq == 'monthly':
+            return _add_months(self.start, index * self.interval)
+        days = self.interval * (7 if self.freq == 'weekly' else 1)
+        return self.start + timedelta(days=index * days)
+
+    def _index_at_or_after(self, moment):
+        # Index of the first occurrence at or after 'moment' (ignoring count / until)
+        if moment <= self.start:
+            return 0
+        if self.freq == 'monthly':
+            months = (moment.year - self.start.year) * 12 + moment.month - self.start.month
+            index = max(months // self.interval - 1, 0)
+            while self._nth(index) < moment: # At most a couple of steps
+                index += 1
+            return index
+        step = timedelta(days=self.interval * (7 if self.freq == 'weekly' else 1))
+        return -((self.start - moment) // step) # Round up
+
+    def _in_series(self, index, occurrence):
+        if self.count is not None and index >= self.count:
+            return False
+        return self.until is None or occurrence <= self.until
+
+    def occurrence_at_or_after(self, moment):
+        """Returns the first occurrence at or after 'moment', or None if the series has ended by then."""
+        index = self._index_at_or_after(moment)
+        occurrence = self._nth(index)
+        return occurrence if self._in_series(index, occurrence) else None
+
+    def last(self):
+        """Returns the last occurrence, or None if the series never ends."""
+        if self.count is not None:
+            last = self._nth(self.count - 1)
+            if self.until is None or last <= self.until:
+                return last
+        if self.until is not None:
+            index = self._index_at_or_after(self.until)
+            if self._nth(index) > self.until:
+                index -= 1
+            return self._nth(max(index, 0))
+        return None
+
+    def current(self, now):
+        """
+        Returns the occurrence to display at 'now': the next one that is not
+        overdue, or the last one once the series has ended.
+        """
+        occurrence = self.occurrence_at_or_after(now)
+        if occurrence is None:
+            occurrence = self.last()
+        return occurrence
+
+    def occurrences(self, after=None):
+        """Lazily yields the occurrences (at or after 'after', if given) in order."""
+        index = self._index_at_or_after(after) if after is not None else 0
+        while True:
+            occurrence = self._nth(index)
+            if not self._in_series(index, occurrence):
+                return
+            yield occurrence
+            index += 1
+
+    def describe(self):
+        """Short Chinese description, e.g. '每周' or '每2天'."""
+        if self.interval == 1:
+            return FREQUENCY_NAMES[self.freq]
+        unit = {'daily': '天', 'weekly': '周', 'monthly': '个月'}[self.freq]
+        return f"每{self.interval}{unit}"
+
+
+def describe_rule(rule):
+    """Returns the Chinese description of an item's 'repeat' value ('' if it doesn't repeat)."""
+    if not rule:
+        return ''
+    try:
+        return Recurrence(None, rule).describe()
+    except ValueError:
+        return '无效重复规则'
+
+
+def item_recurrence(item, start):
+    """Returns the Recurrence of an item (Deadline or dict), or None if it doesn't repeat. Raises ValueError for an invalid rule."""
+    rule = item.get('repeat') if isinstance(item, (dict, Deadline)) else None
+    if not rule:
+        return None
+    return Recurrence(start, rule)
+
+
+def current_due(item, now):
+    """
+    Returns the due datetime of an item at 'now': its 'date', or for a
+    repeating item the occurrence to display. Raises ValueError / TypeError like parse_due.
+    """
+    if isinstance(item, Deadline):
+        due = item.due # Parsed when the date was set
+        if due is None:
+            raise ValueError(f"无效日期格式 '{item.date}'")
+    else:
+        due = parse_due(item.get('date'))
+    recurrence = item_recurrence(item, due)
+    return recurrence.current(now) if recurrence is not None else due
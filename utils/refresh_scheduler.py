@@ -0,0 +1,75 @@
+import math
+from datetime import datetime, timedelta
+
+# Never sleep longer than a day, so the display also catches up after clock changes
+MAX_DELAY_MS = 24 * 3600 * 1000
+# Lower bound of a single wait, protects against busy loops
+MIN_DELAY_MS = 200
+# Extra wait after a label boundary, so the redraw happens safely past it
+BOUNDARY_MARGIN_MS = 50
+
+
+class RefreshScheduler:
+    """
+    Holds the single pending 'after' callback that refreshes the display.
+
+    Instead of redrawing every 60 seconds, the scheduler asks 'next_change'
+    when the displayed text changes next and sleeps exactly until then.
+    Manual refreshes cancel the pending callback and replace it, so there is
+    never more than one timer chain no matter how often refresh_now() is called.
+    """
+
+    def __init__(self, widget, callback, next_change):
+        """
+        Args:
+            widget: any Tk widget, used for after() / after_cancel().
+            callback (callable): redraws the display, called without arguments.
+            next_change (callable): takes 'now' (datetime) and returns the next
+                datetime at which the display changes, or None if it never does.
+        """
+        self.widget = widget
+        self.callback = callback
+        self.next_change = next_change
+        self._after_id = None # The single pending after() handle
+
+    def compute_delay(self, now):
+        """Returns the wait in milliseconds until the next display change after 'now'."""
+        change_time = self.next_change(now)
+        if change_time is None:
+            # Nothing will change on its own, check again at the next midnight
+            change_time = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+
+        delay_ms = math.ceil((change_time - now).total_seconds() * 1000) + BOUNDARY_MARGIN_MS
+        return max(MIN_DELAY_MS, min(MAX_DELAY_MS, delay_ms))
+
+    def schedule(self, delay_ms=None):
+        """
+        (Re)arms the pending refresh. Any previously pending refresh is cancelled.
+        If delay_ms is None, the delay is computed from the next display change.
+        """
+        self.cancel()
+        if delay_ms is None:
+            delay_ms = self.compute_delay(datetime.now())
+        self._after_id = self.widget.after(delay_ms, self._on_timer)
+
+    def refresh_now(self):
+        """Redraws immediately and re-arms the timer for the next display change."""
+        self.cancel()
+        self.callback()
+        self.schedule()
+
+    def cancel(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass # Widget already destroyed
+            self._after_id = None
+
+    def is_pending(self):
+        return self._after_id is not None
+
+    def _on_timer(self):
+        self._after_id = None
+        self.callback()
+        self.schedule()
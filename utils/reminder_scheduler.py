@@ -0,0 +1,240 @@
+import heapq
+import itertools
+import math
+from datetime import datetime, timedelta
+
+from utils.deadline import Deadline
+from utils.recurrence import current_due
+from utils.refresh_scheduler import MAX_DELAY_MS
+
+# Default reminders in minutes before the due time (1 day, 1 hour, 10 minutes),
+# the 'reminder_minutes' setting. An item's own 'reminders' list replaces them.
+DEFAULT_REMINDER_MINUTES = [1440, 60, 10]
+# Lower bound of a single wait, protects against busy loops
+MIN_DELAY_MS = 50
+# The heap is rebuilt without its stale entries once they outnumber the live ones by this factor
+COMPACT_FACTOR = 2
+COMPACT_MIN_STALE = 256
+
+
+def parse_reminder_minutes(text):
+    """
+    Parses '1440, 60, 10' into [1440, 60, 10] (sorted, largest first, no duplicates).
+    An empty string means no reminders. Raises ValueError for anything but non-negative integers.
+    """
+    minutes = set()
+    for part in text.replace('，', ',').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        value = int(part)
+        if value < 0:
+            raise ValueError(f"提醒时间不能为负数 ('{part}')")
+        minutes.add(value)
+    return sorted(minutes, reverse=True)
+
+
+def format_reminder_minutes(minutes):
+    """Inverse of parse_reminder_minutes(): [1440, 60, 10] -> '1440, 60, 10'."""
+    return ', '.join(str(value) for value in minutes)
+
+
+def describe_minutes(minutes):
+    """Chinese description of a reminder offset, e.g. '1天', '1小时', '10分钟'."""
+    if minutes == 0:
+        return '现在'
+    if minutes % 1440 == 0:
+        return f"{minutes // 1440}天"
+    if minutes % 60 == 0:
+        return f"{minutes // 60}小时"
+    return f"{minutes}分钟"
+
+
+class ReminderScheduler:
+    """
+    Fires the reminders of all deadlines with one pending Tk 'after' callback.
+
+    Every reminder (item, minutes before its due time) is an entry of a single
+    min-heap keyed by the time it fires, and only the earliest entry has a timer.
+    Adding or editing an item pushes its new entries (O(log n) each); its older
+    entries are not searched for but become stale through a per-item generation
+    number, and are dropped when they reach the top of the heap (or all at once
+    when the heap is compacted). A repeating item also gets an entry at its due
+    time that schedules the reminders of its next occurrence.
+
+    Connect on_data_change() to DataManager.add_listener() to follow the edits
+    made in the settings window.
+    """
+
+    def __init__(self, widget, on_reminder, reminder_minutes=None):
+        """
+        Args:
+            widget: any Tk widget, used for after() / after_cancel().
+            on_reminder (callable): called as on_reminder(item, minutes_before, due)
+                when a reminder is due.
+            reminder_minutes (list): default reminders, minutes before the due time.
+        """
+        self.widget = widget
+        self.on_reminder = on_reminder
+        self.reminder_minutes = list(DEFAULT_REMINDER_MINUTES if reminder_minutes is None else reminder_minutes)
+        # Entries: (fire time, seq, item_id, generation, minutes before due or None for a rollover)
+        self._heap = []
+        self._items = {} # item_id -> item
+        self._generations = {} # item_id -> generation of the item's live entries
+        self._live_counts = {} # item_id -> number of live entries in the heap
+        self._live = 0
+        self._seq = itertools.count()
+        self._generation = itertools.count(1)
+        self._after_id = None # The single pending after() handle
+        self._armed_time = None # Fire time the pending after() was armed for
+
+    def __len__(self):
+        """Number of reminders that are still to fire."""
+        return self._live
+
+    def load(self, items, now=None):
+        """Replaces all reminders with the ones of 'items'. O(n) with a single heapify."""
+        now = now or datetime.now()
+        self._heap = []
+        self._items = {}
+        self._generations = {}
+        self._live_counts = {}
+        self._live = 0
+        for item in items if isinstance(items, list) else []:
+            item_id = item.get('id') if isinstance(item, (dict, Deadline)) else None
+            if item_id is not None:
+                self._items[item_id] = item
+                self._push_item(item_id, item, now, heap_push=False)
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def set_reminder_minutes(self, reminder_minutes):
+        """Changes the default reminders (the 'reminder_minutes' setting), rescheduling if they differ."""
+        reminder_minutes = list(reminder_minutes)
+        if reminder_minutes != self.reminder_minutes:
+            self.reminder_minutes = reminder_minutes
+            self.load(list(self._items.values()))
+
+    def add(self, item, now=None):
+        """Schedules the reminders of a new or edited item, replacing its earlier ones."""
+        item_id = item.get('id') if isinstance(item, (dict, Deadline)) else None
+        if item_id is None:
+            return
+        self._drop(item_id)
+        self._items[item_id] = item
+        self._push_item(item_id, item, now or datetime.now())
+        self._arm()
+
+    update = add
+
+    def remove(self, item):
+        """Cancels the reminders of a deleted item."""
+        item_id = item.get('id') if isinstance(item, (dict, Deadline)) else None
+        if item_id is None or item_id not in self._items:
+            return
+        self._drop(item_id)
+        del self._items[item_id]
+        self._arm()
+
+    def on_data_change(self, action, item):
+        """Listener for DataManager.add_listener(), see DeadlineEngine.on_data_change()."""
+        if action in ('add', 'update'):
+            self.add(item)
+        elif action == 'delete':
+            self.remove(item)
+        elif action == 'reload':
+            self.load(item)
+
+    def next_fire_time(self):
+        """Returns the time the next reminder fires, or None if there is none."""
+        self._pop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def cancel(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass # Widget already destroyed
+            self._after_id = None
+            self._armed_time = None
+
+    def _item_minutes(self, item):
+        # The item's own reminders, or the default ones
+        minutes = item.get('reminders')
+        return minutes if isinstance(minutes, list) else self.reminder_minutes
+
+    def _push_item(self, item_id, item, now, heap_push=True):
+        # Adds the entries of the item's current occurrence that fire after 'now'
+        try:
+            due = current_due(item, now)
+        except (TypeError, ValueError):
+            return # No valid date, nothing to remind of
+        generation = next(self._generation)
+        self._generations[item_id] = generation
+        entries = []
+        for minutes in self._item_minutes(item):
+            if isinstance(minutes, int) and minutes >= 0:
+                fire_time = due - timedelta(minutes=minutes)
+                if fire_time > now:
+                    entries.append((fire_time, next(self._seq), item_id, generation, minutes))
+        if item.get('repeat') and due > now:
+            entries.append((due, next(self._seq), item_id, generation, None))
+        for entry in entries:
+            if heap_push:
+                heapq.heappush(self._heap, entry)
+            else:
+                self._heap.append(entry)
+        self._live_counts[item_id] = len(entries)
+        self._live += len(entries)
+
+    def _drop(self, item_id):
+        # Marks the item's entries stale, they are skipped once they reach the top of the heap
+        self._generations.pop(item_id, None)
+        self._live -= self._live_counts.pop(item_id, 0)
+        stale = len(self._heap) - self._live
+        if stale > COMPACT_MIN_STALE and stale > COMPACT_FACTOR * self._live:
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+
+    def _is_live(self, entry):
+        return self._generations.get(entry[2]) == entry[3]
+
+    def _pop_stale(self):
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _arm(self):
+        # Keeps exactly one after() pending, for the earliest live entry
+        fire_time = self.next_fire_time()
+        if fire_time == self._armed_time and self._after_id is not None:
+            return # Already armed for it
+        self.cancel()
+        if fire_time is None:
+            return
+        delay_ms = math.ceil((fire_time - datetime.now()).total_seconds() * 1000)
+        self._after_id = self.widget.after(max(MIN_DELAY_MS, min(MAX_DELAY_MS, delay_ms)), self._on_timer)
+        self._armed_time = fire_time
+
+    def _on_timer(self):
+        self._after_id = None
+        self._armed_time = None
+        now = datetime.now()
+        fired = {} # item_id -> (minutes, due), only the closest reminder if several are due at once
+        while self._heap and self._heap[0][0] <= now:
+            fire_time, _, item_id, generation, minutes = heapq.heappop(self._heap)
+            if self._generations.get(item_id) != generation:
+                continue
+            self._live -= 1
+            self._live_counts[item_id] -= 1
+            if minutes is None:
+                # A repeating item reached its due time: schedule its next occurrence
+                self._drop(item_id)
+                self._push_item(item_id, self._items[item_id], max(now, fire_time + timedelta(seconds=1)))
+                continue
+            due = fire_time + timedelta(minutes=minutes)
+            if due >= now and (item_id not in fired or minutes < fired[item_id][0]):
+                fired[item_id] = (minutes, due)
+        self._arm()
+        for item_id, (minutes, due) in fired.items():
+            self.on_reminder(self._items[item_id], minutes, due)
@@ -0,0 +1,137 @@
+import json
+import os
+import queue
+import secrets
+import socket
+import threading
+import time
+
+# Commands a second launch can send to the running instance
+COMMAND_SHOW = 'show'         # Show and raise the overlay
+COMMAND_RELOAD = 'reload'     # Re-read the DDL items from disk
+COMMAND_SETTINGS = 'settings' # Open the settings window
+COMMANDS = (COMMAND_SHOW, COMMAND_RELOAD, COMMAND_SETTINGS)
+
+LOCK_FILE_NAME = 'instance.lock'
+# Port and token of the running instance, written once its socket listens
+INSTANCE_FILE_NAME = 'instance.json'
+IPC_HOST = '127.0.0.1'
+# How long a second launch waits for the running instance (e.g. if it is just starting up)
+SEND_TIMEOUT_SECONDS = 2.0
+
+# This module is imported before tkinter on purpose: a second launch only
+# needs the lock, a socket and a few bytes of JSON, so it exits right away.
+
+
+def _try_lock(lock_file):
+    # Non-blocking exclusive lock, released by the OS when the process ends (even on a crash)
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class SingleInstance:
+    """
+    Makes sure only one DDL tool runs per data folder.
+
+    The first instance holds an exclusive lock on data/instance.lock and
+    listens on a localhost socket whose port (plus a random token) it writes
+    to data/instance.json. Later launches fail to get the lock and use
+    send_command() to forward their request instead of opening a window.
+    Received commands are put into the 'commands' queue for the Tk loop.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.lock_path = os.path.join(data_dir, LOCK_FILE_NAME)
+        self.instance_path = os.path.join(data_dir, INSTANCE_FILE_NAME)
+        self.commands = queue.Queue()
+        self._lock_file = None
+        self._server_socket = None
+        self._token = None
+
+    def acquire(self):
+        """Returns True if this is the only instance (it then holds the lock until close())."""
+        os.makedirs(self.data_dir, exist_ok=True)
+        lock_file = open(self.lock_path, 'a+')
+        if not _try_lock(lock_file):
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def start_server(self):
+        """Starts listening for commands of later launches (call after acquire())."""
+        self._token = secrets.token_hex(16)
+        self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server_socket.bind((IPC_HOST, 0))
+        self._server_socket.listen(5)
+        port = self._server_socket.getsockname()[1]
+
+        temp_path = self.instance_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), 'port': port, 'token': self._token}, f)
+        os.replace(temp_path, self.instance_path)
+
+        threading.Thread(target=self._serve, name="SingleInstanceServer", daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                connection, _ = self._server_socket.accept()
+            except OSError:
+                return # Socket closed by close()
+            with connection:
+                try:
+                    connection.settimeout(1.0)
+                    request = connection.makefile('r', encoding='utf-8').readline().split()
+                    if len(request) == 2 and request[0] == self._token and request[1] in COMMANDS:
+                        self.commands.put(request[1])
+                        connection.sendall(b'ok\n')
+                    else:
+                        connection.sendall(b'error\n')
+                except OSError:
+                    pass
+
+    def close(self):
+        if self._server_socket is not None:
+            self._server_socket.close()
+            self._server_socket = None
+            try:
+                os.remove(self.instance_path)
+            except OSError:
+                pass
+        if self._lock_file is not None:
+            self._lock_file.close() # Releases the lock
+            self._lock_file = None
+
+
+def send_command(data_dir, command, timeout=SEND_TIMEOUT_SECONDS):
+    """
+    Sends a command to the running instance.
+
+    Returns:
+        bool: True if the running instance confirmed the command.
+    """
+    instance_path = os.path.join(data_dir, INSTANCE_FILE_NAME)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with open(instance_path, 'r', encoding='utf-8') as f:
+                instance = json.load(f)
+            with socket.create_connection((IPC_HOST, instance['port']), timeout=timeout) as connection:
+                connection.sendall(f"{instance['token']} {command}\n".encode('utf-8'))
+                return connection.makefile('r', encoding='utf-8').readline().strip() == 'ok'
+        except (OSError, ValueError, KeyError):
+            # Not written yet / stale: the running instance may still be starting up
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
@@ -0,0 +1,397 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from utils.deadline import parse_due
+from utils.recurrence import current_due
+
+# Compact the journal into the snapshot once it grows past this size
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+
+def write_json_atomic(file_path, data):
+    """
+    Writes data as JSON to file_path without ever leaving a truncated file:
+    the data goes to a temporary file first, which then replaces the target.
+    """
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False) # ensure_ascii=False supports Chinese
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, file_path)
+
+
+def read_json_list(file_path):
+    """Reads a JSON file that contains a list. Returns [] if it is missing or invalid."""
+    if not os.path.exists(file_path):
+        return [] # File not found, return empty list
+
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+            if not isinstance(items, list):
+                print(f"Warning: {file_path} content is not a list. Returning empty list.")
+                return []
+            return items
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error loading {file_path}: {e}")
+        return []
+    except Exception as e:
+        print(f"An unexpected error occurred while loading {file_path}: {e}")
+        return []
+
+
+class JsonStore:
+    """
+    Default storage: the whole item list is rewritten to ddl_items.json on every save.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def load(self):
+        items = fold_sqlite_store(self.file_path)
+        if items is not None:
+            return items
+        return self.load_file()
+
+    def load_file(self):
+        """Reads ddl_items.json, folding in a journal left by the 'journal' backend (but not a database)."""
+        journal_store = JournalStore(self.file_path)
+        if journal_store.has_journal():
+            # Switched back from the 'journal' backend: fold the journal into the file
+            items = journal_store.load()
+            journal_store.save_all(items)
+            return items
+        return read_json_list(self.file_path)
+
+    def save_all(self, items):
+        write_json_atomic(self.file_path, items)
+
+    def save_changes(self, get_items, changes):
+        # A JSON file can't be updated partially
+        self.save_all(get_items())
+
+    def watched_paths(self):
+        """Files whose change on disk means the items have to be reloaded."""
+        return [self.file_path]
+
+    def close(self):
+        pass
+
+
+class JournalStore:
+    """
+    Journaled storage: ddl_items.json is the last snapshot, every saved change is
+    appended to ddl_items.journal as one JSON line and fsynced.
+
+    Journal records:
+        {"op": "put", "item": {...}}     item added or edited (the whole item)
+        {"op": "delete", "id": "..."}    item deleted
+
+    Replaying a record twice gives the same result, so a crash at any point
+    of a compaction can be recovered by replaying the old journal again.
+    Once the journal grows past JOURNAL_COMPACT_BYTES, it is rotated to
+    ddl_items.journal.old and a background thread rewrites the snapshot
+    atomically, then deletes the old journal. If that fails, the next
+    compaction rewrites the snapshot synchronously and drops both journals.
+    """
+
+    def __init__(self, file_path, compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.file_path = file_path
+        self.journal_path = os.path.splitext(file_path)[0] + '.journal'
+        self.old_journal_path = self.journal_path + '.old'
+        self.compact_bytes = compact_bytes
+        self._compaction_thread = None
+
+    def has_journal(self):
+        return os.path.exists(self.journal_path) or os.path.exists(self.old_journal_path)
+
+    def load(self):
+        if fold_sqlite_store(self.file_path) is not None:
+            self._remove_journals() # Older than the database that was just folded into the snapshot
+        items_by_id = {}
+        anonymous_items = [] # Snapshot items without an id (files written before ids existed)
+        for item in read_json_list(self.file_path):
+            if isinstance(item, dict) and isinstance(item.get('id'), str):
+                items_by_id[item['id']] = item
+            else:
+                anonymous_items.append(item)
+
+        # An old journal is only left over if a compaction was interrupted
+        interrupted_compaction = os.path.exists(self.old_journal_path)
+        for journal_path in (self.old_journal_path, self.journal_path):
+            self._replay(journal_path, items_by_id)
+
+        items = anonymous_items + list(items_by_id.values())
+        if interrupted_compaction:
+            self.save_all(items)
+        return items
+
+    def _replay(self, journal_path, items_by_id):
+        if not os.path.exists(journal_path):
+            return
+        line = '\n'
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if record['op'] == 'put':
+                        item = record['item']
+                        items_by_id[item['id']] = item
+                    elif record['op'] == 'delete':
+                        items_by_id.pop(record['id'], None)
+                except (ValueError, KeyError, TypeError) as e:
+                    # Typically the last line, if the app crashed while appending
+                    print(f"Warning: skipping invalid record in {journal_path} line {line_number}: {e}")
+
+        if not line.endswith('\n'):
+            # Terminate a partially written last record, so new records start on a line of their own
+            with open(journal_path, 'a', encoding='utf-8') as f:
+                f.write('\n')
+
+    def save_all(self, items):
+        """Writes a full snapshot and drops the journal (synchronously)."""
+        self.wait_for_compaction()
+        write_json_atomic(self.file_path, items)
+        self._remove_journals()
+
+    def _remove_journals(self):
+        for journal_path in (self.journal_path, self.old_journal_path):
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+
+    def save_changes(self, get_items, changes):
+        """
+        Appends the changed items to the journal.
+
+        Args:
+            get_items (callable): returns a snapshot of all items, only called if the journal needs compaction.
+            changes (dict): item id -> item dict (added / edited) or None (deleted).
+        """
+        if not changes:
+            return
+        lines = []
+        for item_id, item in changes.items():
+            if item is None:
+                record = {'op': 'delete', 'id': item_id}
+            else:
+                record = {'op': 'put', 'item': item}
+            lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+            journal_size = f.tell()
+
+        if journal_size >= self.compact_bytes:
+            self._start_compaction(get_items)
+
+    def _start_compaction(self, get_items):
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return # Next save will try again
+
+        # Copy the items now, the caller keeps editing them while the snapshot is written
+        snapshot = [dict(item) if isinstance(item, dict) else item for item in get_items()]
+        if os.path.exists(self.old_journal_path):
+            # An earlier compaction failed and left the old journal behind. The snapshot
+            # covers both journals (saves don't run concurrently), so retry in place.
+            try:
+                self.save_all(snapshot)
+            except Exception as e:
+                print(f"Error compacting {self.journal_path}: {e}")
+            return
+        # New records go to a fresh journal from now on
+        os.replace(self.journal_path, self.old_journal_path)
+        self._compaction_thread = threading.Thread(target=self._compact, args=(snapshot,), daemon=True)
+        self._compaction_thread.start()
+
+    def _compact(self, snapshot):
+        try:
+            write_json_atomic(self.file_path, snapshot)
+            os.remove(self.old_journal_path)
+        except Exception as e:
+            # The old journal is kept and replayed on the next start
+            print(f"Error compacting {self.journal_path}: {e}")
+
+    def watched_paths(self):
+        return [self.file_path, self.journal_path, self.old_journal_path]
+
+    def wait_for_compaction(self):
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+    def close(self):
+        self.wait_for_compaction()
+
+
+class SqliteStore:
+    """
+    SQLite storage: items live in the 'deadlines' table of ddl_items.db, with an
+    index on the due timestamp so that "next N upcoming" and "overdue" can be
+    answered by SQL without loading all items. The connection is opened in WAL
+    mode and stays open until close().
+
+    On first use, the existing ddl_items.json (and journal, if any) is migrated
+    into the database. ddl_items.json is not written while this backend is in
+    use; when the 'json' or 'journal' backend is selected again, it folds the
+    database back into the file and deletes it (see fold_sqlite_store()), and
+    switching to 'sqlite' once more migrates the file again.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path # ddl_items.json, only read for the migration
+        self.db_path = sqlite_db_path(file_path)
+        import sqlite3 # Only loaded when this backend is selected
+        self._lock = threading.Lock() # The connection may be used from a background thread
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS deadlines (
+                id TEXT PRIMARY KEY,
+                name TEXT,
+                date TEXT,
+                due INTEGER,   -- Unix timestamp of 'date', NULL if it can't be parsed
+                item TEXT NOT NULL -- The whole item as JSON
+            )''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS deadlines_due ON deadlines(due)')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    def load(self):
+        if not self.is_migrated():
+            self._migrate_from_json()
+        with self._lock:
+            rows = self._conn.execute('SELECT item FROM deadlines ORDER BY rowid').fetchall()
+        return [json.loads(item_json) for item_json, in rows]
+
+    def _migrate_from_json(self):
+        items = JsonStore(self.file_path).load_file()
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM deadlines') # Left over from an earlier use of this backend
+            self._conn.executemany(UPSERT_SQL, (_deadline_row(item) for item in items if isinstance(item, dict)))
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_json', ?)",
+                               (self.file_path,))
+        print(f"Migrated {len(items)} DDL items from {self.file_path} to {self.db_path}")
+
+    def is_migrated(self):
+        """True while the database (not ddl_items.json) holds the current items."""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_json'").fetchone() is not None
+
+    def mark_folded(self):
+        """Records that the items were written back to ddl_items.json, the next load() migrates again."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM meta WHERE key = 'migrated_from_json'")
+
+    def save_all(self, items):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM deadlines')
+            self._conn.executemany(UPSERT_SQL, (_deadline_row(item) for item in items if isinstance(item, dict)))
+
+    def save_changes(self, get_items, changes):
+        """Writes only the changed items (item id -> item, or None if deleted) in one transaction."""
+        if not changes:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM deadlines WHERE id = ?',
+                                   ((item_id,) for item_id, item in changes.items() if item is None))
+            self._conn.executemany(UPSERT_SQL, (_deadline_row(item) for item in changes.values() if item is not None))
+
+    def query_upcoming(self, now, limit=None):
+        """Returns the items due at or after 'now', earliest first (at most 'limit' items)."""
+        with self._lock:
+            rows = self._conn.execute('SELECT due, item FROM deadlines WHERE due >= ? ORDER BY due LIMIT ?',
+                                      (int(now.timestamp()), -1 if limit is None else limit)).fetchall()
+        items = [(datetime.fromtimestamp(due), json.loads(item_json)) for due, item_json in rows]
+        items += [(due, item) for due, item in self._repeating_items(now) if due >= now]
+        items.sort(key=lambda parsed: parsed[0])
+        return [item for _, item in items[:limit]]
+
+    def query_overdue(self, now):
+        """Returns the items due before 'now', earliest first."""
+        with self._lock:
+            rows = self._conn.execute('SELECT due, item FROM deadlines WHERE due < ? ORDER BY due',
+                                      (int(now.timestamp()),)).fetchall()
+        items = [(datetime.fromtimestamp(due), json.loads(item_json)) for due, item_json in rows]
+        items += [(due, item) for due, item in self._repeating_items(now) if due < now]
+        items.sort(key=lambda parsed: parsed[0])
+        return [item for _, item in items]
+
+    def _repeating_items(self, now):
+        # (current occurrence, item) of the repeating items, which are stored without a 'due' value
+        with self._lock:
+            rows = self._conn.execute("""SELECT item FROM deadlines WHERE due IS NULL AND item LIKE '%"repeat"%'""").fetchall()
+        for item_json, in rows:
+            item = json.loads(item_json)
+            try:
+                yield current_due(item, now), item
+            except (TypeError, ValueError):
+                continue
+
+    def watched_paths(self):
+        # Commits of other connections land in the WAL file first
+        return [self.db_path, self.db_path + '-wal']
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def sqlite_db_path(file_path):
+    """Path of the 'sqlite' backend's database next to ddl_items.json."""
+    return os.path.splitext(file_path)[0] + '.db'
+
+
+def fold_sqlite_store(file_path):
+    """
+    Writes the items of the 'sqlite' backend back to ddl_items.json if the
+    database holds newer items than the file (the backend was switched away
+    from 'sqlite'), then deletes the database, so later loads of the other
+    backends don't open it again. Returns the items, or None if there was
+    nothing to fold.
+    """
+    db_path = sqlite_db_path(file_path)
+    if not os.path.exists(db_path):
+        return None # The common case, sqlite3 isn't even imported
+    items = None
+    sqlite_store = SqliteStore(file_path)
+    try:
+        if sqlite_store.is_migrated():
+            items = sqlite_store.load()
+            write_json_atomic(file_path, items)
+            sqlite_store.mark_folded() # In case the file can't be deleted below
+    finally:
+        sqlite_store.close()
+    if items is not None:
+        print(f"Wrote {len(items)} DDL items from {db_path} back to {file_path}")
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"Warning: could not delete {path}: {e}")
+    return items
+
+
+# Insert or update an item, keeping its rowid (and so its position) if it already exists
+UPSERT_SQL = '''INSERT INTO deadlines (id, name, date, due, item) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET name = excluded.name, date = excluded.date,
+                                  due = excluded.due, item = excluded.item'''
+
+
+def _deadline_row(item):
+    # Row values for UPSERT_SQL
+    date_str = item.get('date')
+    try:
+        # A repeating item has no fixed due time, it is resolved when queried
+        due = None if item.get('repeat') else int(parse_due(date_str).timestamp())
+    except (TypeError, ValueError, OverflowError, OSError):
+        due = None
+    return (item.get('id'), item.get('name'), date_str, due, json.dumps(item, ensure_ascii=False))
@@ -1,8 +1,20 @@
-import winreg
 import sys
 import os
+import time
 # Need get_app_base_path from data_manager to find ddltool.py if not frozen
 from utils.data_manager import get_app_base_path # Import the helper function
+try:
+    import winreg
+except ImportError:
+    # Not on Windows (e.g. the benchmarks under Xvfb): auto-start is unavailable, the functions report failure
+    winreg = None
+
+# Auto-start state read from the registry: (app_name, command) -> (enabled, time.monotonic() of the read).
+# set_auto_start() updates it, other programs (e.g. the Task Manager) may change the
+# registry too, so entries expire after AUTO_START_CACHE_SECONDS.
+AUTO_START_CACHE_SECONDS = 300
+_auto_start_cache = {}
+
 
 def get_auto_start_command():
     """
@@ -49,9 +61,11 @@ def set_auto_start(app_name, command, enable):
                 print(f"'{app_name}' 的开机自启动原本就已禁用。")
 
         winreg.CloseKey(key)
+        _auto_start_cache[(app_name, command)] = (enable, time.monotonic())
         return True
 
     except Exception as e:
+        _auto_start_cache.pop((app_name, command), None) # State unknown now
         print(f"修改开机自启动注册表时出错: {e}")
         print("请确保您拥有必要的权限。")
         return False
@@ -68,6 +82,16 @@ def is_auto_start_enabled(app_name, command):
     Returns:
         bool: If enabled and command matches, True, otherwise False.
     """
+    cached = _auto_start_cache.get((app_name, command))
+    if cached is not None and time.monotonic() - cached[1] < AUTO_START_CACHE_SECONDS:
+        return cached[0]
+    is_enabled = _read_auto_start(app_name, command)
+    _auto_start_cache[(app_name, command)] = (is_enabled, time.monotonic())
+    return is_enabled
+
+
+def _read_auto_start(app_name, command):
+    # The registry query behind is_auto_start_enabled()
     key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
 
     try: